@@ -1,17 +1,23 @@
+import json
 import os
+import queue
 
 import dash
+import flask
 from dash import Dash, Input, Output, dcc, html
 
 from orcha.core import initialise
 
+from .components import collapsible_div_cmp, run_slices_cmp
 from .credentials import (
     ORCHA_CORE_DB,
     ORCHA_CORE_PASSWORD,
     ORCHA_CORE_SERVER,
     ORCHA_CORE_USER,
+    OVERVIEW_PREWARM_SECONDS,
     PLOTLY_APP_PATH,
 )
+from .utils import change_watcher, overview_prewarm
 
 initialise(
     orcha_user=ORCHA_CORE_USER,
@@ -37,6 +43,47 @@ app = Dash(__name__,
 
 app._favicon = 'favicon.ico'
 
+if OVERVIEW_PREWARM_SECONDS > 0:
+    overview_prewarm.start(OVERVIEW_PREWARM_SECONDS)
+
+
+# small endpoint for the run slice tooltips that are loaded on hover
+@app.server.route(f'{PLOTLY_APP_PATH}api/run_tooltip/<run_idk>')
+def run_tooltip(run_idk: str):
+    data = run_slices_cmp.get_cached_run_tooltip_data(run_idk)
+    if data is None:
+        return flask.jsonify([['Status', 'Run not found']]), 404
+    # sent as pairs as jsonify would sort the keys of a dict
+    return flask.jsonify(list(data.items()))
+
+
+# server-sent events for run and task changes, see assets/live_updates.js.
+# Each open stream holds its worker (thread) for as long as the page is open,
+# so under gunicorn use gthread workers with enough threads for the open
+# pages, or gevent workers, rather than the default sync workers. Only the
+# pages with a live events listener (components/live_events_cmp.py) open one
+@app.server.route(f'{PLOTLY_APP_PATH}api/events')
+def live_events():
+    def stream():
+        subscriber = change_watcher.subscribe()
+        try:
+            while True:
+                try:
+                    event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # keeps proxies from closing an idle connection
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f'data: {json.dumps(event)}\n\n'
+        finally:
+            change_watcher.unsubscribe(subscriber)
+
+    return flask.Response(
+        flask.stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 def get_nav_list(current_page: str = ''):
     link_list = []
     for page in dash.page_registry.values():
@@ -60,6 +107,10 @@ app.layout = html.Div(className='container-fluid p-3 main-page', children=[
     dcc.Location(id='app-location', refresh='callback-nav'),
     dcc.Location(id='app-location-external', refresh=True),
     dcc.Location(id='app-location-norefresh', refresh=False),
+    # latest run/task change event pushed from the server
+    dcc.Store(id='app-live-events', data=None),
+    # which collapsible containers were left collapsed
+    collapsible_div_cmp.create_collapse_state_store(),
     html.Div(className='row', children=[
         html.Div(className='col-auto', children=[
             dcc.Link([
@@ -0,0 +1,16 @@
+// Helpers shared by the other scripts in assets, loaded before them as the
+// assets are included in alphabetical order.
+window.orchaUi = Object.assign({}, window.orchaUi, {
+    // the app's url prefix, e.g. when served under PLOTLY_APP_PATH
+    getBasePath: function() {
+        const config = document.getElementById('_dash-config');
+        if (config) {
+            try {
+                return JSON.parse(config.textContent).url_base_pathname || '/';
+            } catch (e) {
+                return '/';
+            }
+        }
+        return '/';
+    }
+});
@@ -0,0 +1,60 @@
+// Listens to the run/task change events pushed by the server (api/events)
+// and puts the latest one in the app-live-events store, which pages use to
+// refresh only when something they show has changed. The stream is only
+// open while the page has a live events listener (see
+// components/live_events_cmp.py), as each open stream holds a server worker.
+(function() {
+    if (!window.EventSource) {
+        return;
+    }
+
+    let source = null;
+    let checkPending = false;
+
+    function openStream() {
+        // EventSource reconnects by itself if the connection drops
+        source = new EventSource(window.orchaUi.getBasePath() + 'api/events');
+        source.onmessage = function(message) {
+            if (!window.dash_clientside || !window.dash_clientside.set_props) {
+                return;
+            }
+            window.dash_clientside.set_props('app-live-events', {
+                data: JSON.parse(message.data)
+            });
+        };
+    }
+
+    function updateStream() {
+        checkPending = false;
+        const wanted = document.querySelector('[data-live-events]') !== null;
+        if (wanted && source === null) {
+            openStream();
+        } else if (!wanted && source !== null) {
+            source.close();
+            source = null;
+        }
+    }
+
+    // pages are swapped without a reload, so check again whenever the
+    // document changes, at most once per task
+    function scheduleUpdate() {
+        if (!checkPending) {
+            checkPending = true;
+            setTimeout(updateStream, 0);
+        }
+    }
+
+    function start() {
+        new MutationObserver(scheduleUpdate).observe(document.body, {
+            childList: true,
+            subtree: true
+        });
+        scheduleUpdate();
+    }
+
+    if (document.body) {
+        start();
+    } else {
+        document.addEventListener('DOMContentLoaded', start);
+    }
+})();
@@ -0,0 +1,271 @@
+// Document level handlers for run slices and run strips, and the run strip
+// renderer, see components/run_slices_cmp.py. Handling these through
+// delegation means the number of runs on a page doesn't add any callbacks
+// or listeners.
+(function() {
+    const getBasePath = window.orchaUi.getBasePath;
+
+    function fillTooltip(tooltip, data) {
+        tooltip.innerHTML = '';
+        for (const [label, value] of data) {
+            const p = document.createElement('p');
+            const b = document.createElement('b');
+            b.textContent = label + ': ';
+            p.appendChild(b);
+            p.appendChild(document.createTextNode(value));
+            tooltip.appendChild(p);
+        }
+    }
+
+    // loads the details of lazy tooltips the first time a slice is hovered,
+    // see run_slices_cmp.create_run_slice_row_bunched(lazy_tooltips=True)
+    document.addEventListener('mouseover', function(event) {
+        if (!event.target.closest) {
+            return;
+        }
+        const slice = event.target.closest('.c-tooltip[data-lazy-tooltip]');
+        if (!slice || !slice.dataset.runId || slice.dataset.tooltipState) {
+            return;
+        }
+        const tooltip = slice.querySelector('.c-tooltiptext');
+        if (!tooltip) {
+            return;
+        }
+        slice.dataset.tooltipState = 'loading';
+        const url = getBasePath() + 'api/run_tooltip/' + encodeURIComponent(slice.dataset.runId);
+        fetch(url)
+            .then((response) => response.json())
+            .then((data) => {
+                fillTooltip(tooltip, data);
+                slice.dataset.tooltipState = 'loaded';
+            })
+            .catch(() => {
+                // allow another attempt on the next hover
+                delete slice.dataset.tooltipState;
+            });
+    });
+
+    // run strips, see run_slices_cmp.create_run_strip. The svg is drawn
+    // into a child element that React doesn't manage, so a re-render of the
+    // strip's div can't wipe it, and is redrawn whenever that element is
+    // resized, e.g. the window is resized or a collapsed container holding
+    // the strip is expanded.
+    const SVG_NS = 'http://www.w3.org/2000/svg';
+    let stripTooltip = null;
+    let hoveredRect = null;
+
+    function drawRunStrip(canvas) {
+        const data = canvas.runStripData;
+        const pixels = Math.floor(canvas.clientWidth);
+        if (!data || pixels === canvas.runStripPixels) {
+            return;
+        }
+        canvas.runStripPixels = pixels;
+        if (hoveredRect && canvas.contains(hoveredRect)) {
+            hideStripTooltip();
+        }
+        canvas.replaceChildren();
+        if (data.offsets.length === 0) {
+            const empty = document.createElement('div');
+            empty.className = 'text-muted';
+            empty.textContent = 'No recent runs to display';
+            canvas.appendChild(empty);
+            return;
+        }
+        if (pixels === 0) {
+            // hidden, drawn once it has a width
+            return;
+        }
+
+        // bucket the runs by pixel column, keeping the worst run per column
+        const total = Math.max(data.seconds, 1);
+        const columns = new Map();
+        for (let i = 0; i < data.offsets.length; i++) {
+            const col = Math.min(Math.max(Math.floor(data.offsets[i] / total * pixels), 0), pixels - 1);
+            const cur = columns.get(col);
+            if (!cur) {
+                const counts = new Array(data.classes.length).fill(0);
+                counts[data.codes[i]] = 1;
+                columns.set(col, {idx: i, count: 1, counts: counts, width: data.widths[i]});
+                continue;
+            }
+            cur.count += 1;
+            cur.counts[data.codes[i]] += 1;
+            cur.width = Math.max(cur.width, data.widths[i]);
+            if (data.codes[i] >= data.codes[cur.idx]) {
+                cur.idx = i;
+            }
+        }
+
+        const svg = document.createElementNS(SVG_NS, 'svg');
+        svg.setAttribute('width', '100%');
+        svg.setAttribute('height', '1.5em');
+        svg.setAttribute('preserveAspectRatio', 'none');
+        for (const [col, cur] of columns.entries()) {
+            const i = cur.idx;
+            const rect = document.createElementNS(SVG_NS, 'rect');
+            rect.setAttribute('x', (col / pixels * 100) + '%');
+            rect.setAttribute('y', 0);
+            rect.setAttribute('height', '100%');
+            rect.setAttribute('width', Math.max(cur.width / total * 100, 0.5) + '%');
+            rect.setAttribute('class', data.classes[data.codes[i]]);
+            rect.setAttribute('data-run-id', data.run_ids[i]);
+            rect.setAttribute('data-run-count', cur.count);
+            if (cur.count > 1) {
+                // the number of each status merged into the column, e.g.
+                // 'success: 3, failed: 1', worst first
+                const statuses = [];
+                for (let code = cur.counts.length - 1; code >= 0; code--) {
+                    if (cur.counts[code] > 0) {
+                        statuses.push(data.classes[code].replace(/^run-/, '') + ': ' + cur.counts[code]);
+                    }
+                }
+                rect.setAttribute('data-status-counts', statuses.join(', '));
+            }
+            svg.appendChild(rect);
+        }
+        canvas.appendChild(svg);
+    }
+
+    const resizeObserver = window.ResizeObserver ? new ResizeObserver(function(entries) {
+        for (const entry of entries) {
+            if (!entry.target.isConnected) {
+                // the strip was replaced, stop watching the old one
+                resizeObserver.unobserve(entry.target);
+                continue;
+            }
+            drawRunStrip(entry.target);
+        }
+    }) : null;
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        run_strips: {
+            draw: function(data) {
+                const ctx = window.dash_clientside.callback_context;
+                if (!data || !ctx.outputs_list) {
+                    return window.dash_clientside.no_update;
+                }
+                const outId = ctx.outputs_list.id;
+                const domId = '{' + Object.keys(outId).sort().map(
+                    (k) => JSON.stringify(k) + ':' + JSON.stringify(outId[k])
+                ).join(',') + '}';
+                const container = document.getElementById(domId);
+                if (!container) {
+                    return window.dash_clientside.no_update;
+                }
+                let canvas = container.querySelector(':scope > .run-strip-canvas');
+                if (!canvas) {
+                    canvas = document.createElement('div');
+                    canvas.className = 'run-strip-canvas';
+                    container.appendChild(canvas);
+                    if (resizeObserver) {
+                        resizeObserver.observe(canvas);
+                    }
+                }
+                canvas.runStripData = data;
+                canvas.runStripPixels = null;
+                drawRunStrip(canvas);
+                return window.dash_clientside.no_update;
+            }
+        }
+    });
+
+    function hideStripTooltip() {
+        hoveredRect = null;
+        if (stripTooltip) {
+            stripTooltip.style.display = 'none';
+        }
+    }
+
+    // shows the same details as the run slice tooltips for the hovered run
+    // strip rect, loaded from the lazy tooltip endpoint
+    function showStripTooltip(rect) {
+        if (!stripTooltip) {
+            stripTooltip = document.createElement('div');
+            stripTooltip.className = 'run-strip-tooltip';
+            document.body.appendChild(stripTooltip);
+        }
+        hoveredRect = rect;
+        const count = Number(rect.getAttribute('data-run-count') || 1);
+        const addCount = function() {
+            if (count > 1) {
+                // several runs share the column, the details shown are of
+                // the worst of them
+                const p = document.createElement('p');
+                const b = document.createElement('b');
+                b.textContent = 'Runs: ';
+                p.appendChild(b);
+                p.appendChild(document.createTextNode(
+                    count + ' (' + rect.getAttribute('data-status-counts') + ')'
+                ));
+                stripTooltip.appendChild(p);
+            }
+        };
+        fillTooltip(stripTooltip, [['Status', 'Loading...']]);
+        addCount();
+
+        const box = rect.getBoundingClientRect();
+        const left = Math.min(
+            Math.max(box.left + box.width / 2 - 140, 0),
+            Math.max(window.innerWidth - 290, 0)
+        );
+        stripTooltip.style.left = left + 'px';
+        stripTooltip.style.top = (box.bottom + 6) + 'px';
+        stripTooltip.style.display = 'block';
+
+        const runId = rect.getAttribute('data-run-id');
+        const url = getBasePath() + 'api/run_tooltip/' + encodeURIComponent(runId);
+        fetch(url)
+            .then((response) => response.json())
+            .then((data) => {
+                if (hoveredRect !== rect) {
+                    return;
+                }
+                fillTooltip(stripTooltip, data);
+                addCount();
+            })
+            .catch(() => {
+                if (hoveredRect === rect) {
+                    fillTooltip(stripTooltip, [['Status', 'Could not load the run']]);
+                }
+            });
+    }
+
+    document.addEventListener('mouseover', function(event) {
+        if (!event.target.closest) {
+            return;
+        }
+        const rect = event.target.closest('.run-strip-canvas rect[data-run-id]');
+        if (rect) {
+            if (rect !== hoveredRect) {
+                showStripTooltip(rect);
+            }
+        } else if (hoveredRect) {
+            hideStripTooltip();
+        }
+    });
+
+    // navigates to the run details page when a run slice or strip rect is
+    // clicked, without a round trip to the server
+    document.addEventListener('click', function(event) {
+        if (event.button !== 0 || !event.target.closest) {
+            return;
+        }
+        const target = event.target.closest('[data-run-id]');
+        if (!target) {
+            return;
+        }
+        const runId = target.getAttribute('data-run-id');
+        if (!runId) {
+            return;
+        }
+        const url = getBasePath() + 'run_details?run_id=' + encodeURIComponent(runId);
+        event.preventDefault();
+        if (event.ctrlKey || event.metaKey) {
+            window.open(url, '_blank');
+            return;
+        }
+        window.history.pushState({}, '', url);
+        window.dispatchEvent(new CustomEvent('_dashprivate_pushstate'));
+    });
+})();
@@ -4,18 +4,51 @@ import random
 from typing import Sequence
 
 import dash
-from dash import MATCH, Input, Output, State, html
+from dash import MATCH, Input, Output, State, dcc, html
 from dash.development.base_component import Component
 
 COLLAPSIBLE_DIV_TYPE = 'cdc-collapsible-div-type'
 COLLAPSIBLE_BTN_TYPE = 'cdc-collapsible-id-type'
+# local storage store of {container_id: True} for the collapsed containers
+COLLAPSE_STATE_ID = 'cdc-collapse-state'
+# containers without a container_id get a random index with this prefix,
+# their collapse state isn't remembered as the index changes every render
+# (both are also used in the clientside callback below)
+RANDOM_INDEX_PREFIX = 'cdc-random-'
+
+
+def create_collapse_state_store():
+    """
+    Creates the store remembering which containers are collapsed, this
+    should be in the app layout once.
+    """
+    return dcc.Store(id=COLLAPSE_STATE_ID, storage_type='local', data={})
+
+
+def is_collapsed(collapse_state: dict | None, container_id: str) -> bool:
+    """
+    Returns whether the container was last left collapsed, given the data
+    of the COLLAPSE_STATE_ID store.
+    """
+    return bool((collapse_state or {}).get(container_id))
+
 
 def create_collapsible_container(
         children: Component | Sequence[Component],
         title: str,
-        className: str
+        className: str,
+        attributes: dict[str, str] | None = None,
+        container_id: str | None = None,
+        collapsed: bool = False
     ):
-    index = str(random.randint(0, 999999999))
+    """
+    Creates a container with a title and a button to collapse its children.
+    Any `attributes` (e.g. data-* attributes) are set on the outer div.
+    With a `container_id` the component ids are the same on every render and
+    the collapse state is remembered, pass `collapsed` (see is_collapsed) to
+    render it the way it was left.
+    """
+    index = container_id or f'{RANDOM_INDEX_PREFIX}{random.randint(0, 999999999)}'
     return html.Div(
         children=[
             html.Div(className='row', children=[
@@ -24,7 +57,7 @@ def create_collapsible_container(
                 ]),
                 html.Div(className='col-auto', children=[
                     html.Button(
-                        'Collapse',
+                        'Expand' if collapsed else 'Collapse',
                         className='btn btn-secondary btn-sm',
                         id={
                             'type': COLLAPSIBLE_BTN_TYPE,
@@ -34,7 +67,7 @@ def create_collapsible_container(
                 ]),
             ]),
             html.Div(
-                className='row',
+                className='row d-none' if collapsed else 'row',
                 id={
                     'type': COLLAPSIBLE_DIV_TYPE,
                     'index': index
@@ -42,17 +75,37 @@ def create_collapsible_container(
                 children=children
             ),
         ],
-        className=f'container-fluid {className}'
+        className=f'container-fluid {className}',
+        **(attributes or {})
     )
 
 
+def get_container_children(container):
+    """
+    Returns the location of the children within a container created by
+    create_collapsible_container, e.g. to update them with a dash.Patch
+    """
+    return container['props']['children'][1]['props']['children']
+
+
 dash.clientside_callback(
 '''
-async function(n_clicks, class_name) {
+async function(n_clicks, class_name, button_id, collapse_state) {
     if (n_clicks === undefined) {
         return dash_clientside.no_update;
     }
-    if (class_name.includes('d-none')) {
+    const collapsing = !class_name.includes('d-none');
+    const index = button_id.index;
+    if (!index.startsWith('cdc-random-')) {
+        const state = Object.assign({}, collapse_state || {});
+        if (collapsing) {
+            state[index] = true;
+        } else {
+            delete state[index];
+        }
+        dash_clientside.set_props('cdc-collapse-state', {data: state});
+    }
+    if (!collapsing) {
         return [
             'Collapse',
             class_name.replace('d-none', '').trim().replace('  ', ' ')
@@ -65,5 +118,7 @@ Output({'type': COLLAPSIBLE_BTN_TYPE, 'index': MATCH}, 'children'),
 Output({'type': COLLAPSIBLE_DIV_TYPE, 'index': MATCH}, 'className'),
 Input({'type': COLLAPSIBLE_BTN_TYPE, 'index': MATCH}, 'n_clicks'),
 State({'type': COLLAPSIBLE_DIV_TYPE, 'index': MATCH}, 'className'),
+State({'type': COLLAPSIBLE_BTN_TYPE, 'index': MATCH}, 'id'),
+State(COLLAPSE_STATE_ID, 'data'),
 prevent_initial_call=True,
-)
\ No newline at end of file
+)
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from dash import html
+
+# pages with an element carrying this attribute get the run/task change
+# events in the app-live-events store, see assets/live_updates.js
+LISTENER_ATTRIBUTE = 'data-live-events'
+
+
+def create_live_events_listener():
+    """
+    Creates the (hidden) marker that opens the event stream while the page
+    is shown. Only add it to pages with callbacks on app-live-events, each
+    open stream holds a server worker.
+    """
+    return html.Div(className='d-none', **{LISTENER_ATTRIBUTE: 'true'})
@@ -2,14 +2,31 @@ from __future__ import annotations
 
 import json
 from datetime import datetime as dt
+from datetime import timedelta as td
 
 import dash
-from dash import ALL, Input, Output, html
+from dash import MATCH, ClientsideFunction, Input, Output, dcc, html
 
 from orcha.core import tasks
 from orcha_ui.utils import format_dt
 
-POPOVER_ID_TYPE = 'rcs-popover-run'
+RUN_STRIP_TYPE = 'rcs-run-strip'
+RUN_STRIP_DATA_TYPE = 'rcs-run-strip-data'
+
+TOOLTIP_CACHE_TTL = td(seconds=10)
+_tooltip_cache: dict[str, tuple[dt, dict[str, str]]] = {}
+
+# Ordering of the slice classes from best to worst, used to show the worst
+# run where several runs share a pixel column of a run strip
+RUN_SLICE_SEVERITY = [
+    'run-success',
+    'run-cancelled',
+    'run-queued',
+    'run-running',
+    'run-unknown',
+    'run-warning',
+    'run-failed',
+]
 
 
 def get_run_slice_css_class(run: tasks.RunItem):
@@ -30,6 +47,37 @@ def get_run_slice_css_class(run: tasks.RunItem):
     else:
         return 'run-unknown'
 
+def get_run_display_span(run: tasks.RunItem) -> tuple[dt, dt]:
+    """
+    Returns the (start, end) times a run slice covers in a run strip.
+    """
+    # If we don't have start or end times, then set them to some defaults
+    # for a sensible width
+    if run.start_time is not None:
+        start_time = run.start_time
+    else:
+        # if it hasn't started, then the width is zero
+        start_time = run.scheduled_time
+
+    if run.end_time is not None:
+        end_time = run.end_time
+    # If we don't have an end time, then use the last_active time
+    # e.g. it failed/stopped when it was last active
+    elif run.status in [
+            tasks.RunStatusEnum.warn.value,
+            tasks.RunStatusEnum.failed.value,
+            tasks.RunStatusEnum.success.value
+        ]:
+        # Zero duration if we don't have an active time
+        if run.last_active is None:
+            end_time = start_time
+        else:
+            end_time = run.last_active
+    else:
+        end_time = start_time
+
+    return start_time, end_time
+
 def run_start_time(run: tasks.RunItem) -> str:
     if run.start_time is not None:
         return str(run.start_time).split('.')[0]
@@ -45,36 +93,83 @@ def run_duration(run: tasks.RunItem) -> str:
     else:
         return 'Not started'
 
+def get_run_tooltip_data(run: tasks.RunItem) -> dict[str, str]:
+    return {
+        'Scheduled': str(run.scheduled_time),
+        'Start': run_start_time(run),
+        'Duration': run_duration(run),
+        'Status': run.status,
+        'Config': json.dumps(run.config),
+    }
+
+
+def get_cached_run_tooltip_data(run_idk: str) -> dict[str, str] | None:
+    """
+    Returns the tooltip details for a run, cached for a few seconds so
+    hovering back and forth over the same slices doesn't re-query the run.
+    """
+    cached = _tooltip_cache.get(run_idk)
+    if cached is not None and cached[0] > (dt.now() - TOOLTIP_CACHE_TTL):
+        return cached[1]
+    run = tasks.RunItem.get(run_idk)
+    if run is None:
+        return None
+    # keep the cache small, it only needs to cover what is being hovered
+    if len(_tooltip_cache) > 1000:
+        _tooltip_cache.clear()
+    data = get_run_tooltip_data(run)
+    _tooltip_cache[run_idk] = (dt.now(), data)
+    return data
+
+
+def _create_run_slice(
+        run: tasks.RunItem,
+        width: str,
+        lazy_tooltip: bool
+    ):
+    if lazy_tooltip:
+        # the details are loaded on hover by assets/run_slices.js
+        tooltip_children = [html.P('Loading...')]
+        lazy_attrs = {'data-lazy-tooltip': 'true'}
+    else:
+        tooltip_children = [
+            html.P([html.B(f'{label}: '), value])
+            for label, value in get_run_tooltip_data(run).items()
+        ]
+        lazy_attrs = {}
+    # clicks are handled by the delegated handler in assets/run_slices.js
+    return html.Div(
+        style={'width': width},
+        className=f'c-tooltip {get_run_slice_css_class(run)}',
+        children=[
+            '-',
+            html.Div(className='c-tooltiptext', children=tooltip_children)
+        ],
+        **{'data-run-id': run.run_idk},
+        **lazy_attrs
+    )
+
+
 def create_run_slice_row_bunched(
         title_div: html.Div,
-        task_runs: list[tasks.RunItem]
+        task_runs: list[tasks.RunItem],
+        lazy_tooltips: bool = False
     ):
     """
     Creates a row of run slices for a task without spacing between runs
     based on time between runs. Useful for 'last 5 runs' etc.
+    With `lazy_tooltips` the slices only carry the run id and the tooltip
+    details are fetched when a slice is first hovered.
     """
     return html.Div(className='row', children=[
         html.Div(className='col-auto', children=[
             title_div
         ]),
         html.Div(className='col-auto', children=[
-            html.Div(
-                id={
-                    'type': POPOVER_ID_TYPE,
-                    'index': run.run_idk
-                },
-                style={'width': '10px'},
-                className=f'c-tooltip {get_run_slice_css_class(run)}',
-                children=[
-                    '-',
-                    html.Div(className='c-tooltiptext', children=[
-                        html.P([html.B('Scheduled: '), run.scheduled_time]),
-                        html.P([html.B('Start: '), run_start_time(run)]),
-                        html.P([html.B('Duration: '), run_duration(run)]),
-                        html.P([html.B('Status: '), run.status]),
-                        html.P([html.B('Config: '), json.dumps(run.config)]),
-                    ])
-                ]
+            _create_run_slice(
+                run=run,
+                width='10px',
+                lazy_tooltip=lazy_tooltips
             )
             for run in task_runs
         ])
@@ -88,34 +183,13 @@ def create_run_slice_row(
         display_end_time: dt,
         display_count: int | None = None,
     ):
+    """
+    Creates a row of run slices for a task, positioned and sized by time
+    within the display window.
+    """
 
     def _get_run_width(run: tasks.RunItem):
-        # If we don't have start or end times, then set them to some defaults
-        # for a sensible width
-        if run.start_time is not None:
-            start_time = run.start_time
-        else:
-            # if it hasn't started, then the width is zero
-            start_time = run.scheduled_time
-            end_time = start_time
-
-        if run.end_time is not None:
-            end_time = run.end_time
-        # If we don't have an end time, then use the last_active time
-        # e.g. it failed/stopped when it was last active
-        elif run.status in [
-                tasks.RunStatusEnum.warn.value,
-                tasks.RunStatusEnum.failed.value,
-                tasks.RunStatusEnum.success.value
-            ]:
-            # Zero duration if we don't have an active time
-            if run.last_active is None:
-                end_time = start_time
-            else:
-                end_time = run.last_active
-        else:
-            end_time = start_time
-
+        start_time, end_time = get_run_display_span(run)
         run_duration = end_time - start_time
         run_duration_in_hours = run_duration.total_seconds() / 3600
         run_width_percentage = (run_duration_in_hours / display_hours) * 100
@@ -160,23 +234,10 @@ def create_run_slice_row(
                 )}
             ))
 
-        run_elements.append(html.Div(
-            id={
-                'type': POPOVER_ID_TYPE,
-                'index': run.run_idk
-            },
-            style={'width': _get_run_width(run)},
-            className=f'c-tooltip {get_run_slice_css_class(run)}',
-            children=[
-                '-',
-                html.Div(className='c-tooltiptext', children=[
-                    html.P([html.B('Scheduled: '), run.scheduled_time]),
-                    html.P([html.B('Start: '), run_start_time(run)]),
-                    html.P([html.B('Duration: '), run_duration(run)]),
-                    html.P([html.B('Status: '), run.status]),
-                    html.P([html.B('Config: '), json.dumps(run.config)]),
-                ])
-            ]
+        run_elements.append(_create_run_slice(
+            run=run,
+            width=_get_run_width(run),
+            lazy_tooltip=False
         ))
         # get the end time as either the next run if we have one
         # or the end of the display window
@@ -219,20 +280,84 @@ def create_run_slice_row(
     ])
 
 
-# navigate to the run details page
-@dash.callback(
-    Output('app-location', 'pathname', allow_duplicate=True),
-    Output('app-location', 'search', allow_duplicate=True),
-    Input({'type': POPOVER_ID_TYPE, 'index': ALL}, 'n_clicks'),
-    prevent_initial_call=True,
+def get_run_strip_data(
+        all_runs: list[tasks.RunItem],
+        display_start_time: dt,
+        display_end_time: dt
+    ) -> dict:
+    """
+    Returns the runs as compact columnar arrays for the clientside run strip
+    renderer. Offsets (from the window start) and widths are in seconds and
+    status codes index into RUN_SLICE_SEVERITY.
+    """
+    all_runs = sorted(all_runs, key=lambda x: x.scheduled_time)
+    offsets: list[int] = []
+    widths: list[int] = []
+    codes: list[int] = []
+    run_ids: list[str] = []
+    for run in all_runs:
+        start_time, end_time = get_run_display_span(run)
+        offsets.append(int((run.scheduled_time - display_start_time).total_seconds()))
+        widths.append(int((end_time - start_time).total_seconds()))
+        codes.append(RUN_SLICE_SEVERITY.index(get_run_slice_css_class(run)))
+        run_ids.append(run.run_idk)
+
+    return {
+        'seconds': int((display_end_time - display_start_time).total_seconds()),
+        'classes': RUN_SLICE_SEVERITY,
+        'offsets': offsets,
+        'widths': widths,
+        'codes': codes,
+        'run_ids': run_ids,
+    }
+
+
+def create_run_strip(
+        strip_id: str,
+        all_runs: list[tasks.RunItem],
+        display_start_time: dt,
+        display_end_time: dt
+    ):
+    """
+    Creates a run strip that is drawn clientside as a single SVG from the
+    columnar data in a dcc.Store, rather than as one component (and tooltip)
+    per run like create_run_slice_row. The SVG is redrawn whenever the strip
+    is resized and the run details are loaded on hover like lazy tooltips.
+    `strip_id` must be unique on the page.
+    """
+    border_classes = 'border-start border-end border-dark'
+
+    return html.Div(className='row', children=[
+        html.Div(className='col-12', children=[
+            html.Div(className=f'row g-0 px-1 {border_classes}', children=[
+                # add a start time as the first element
+                html.Div(format_dt(display_start_time), className='col-auto'),
+                html.Div(' ', className='col'),
+                html.Div(format_dt(display_end_time), className='col-auto'),
+            ]),
+        ]),
+        html.Div(className='col-12', children=[
+            html.Div(
+                id={'type': RUN_STRIP_TYPE, 'index': strip_id},
+                className=f'run-strip px-1 {border_classes}',
+                children=[]
+            ),
+            dcc.Store(
+                id={'type': RUN_STRIP_DATA_TYPE, 'index': strip_id},
+                data=get_run_strip_data(
+                    all_runs=all_runs,
+                    display_start_time=display_start_time,
+                    display_end_time=display_end_time
+                )
+            ),
+        ]),
+    ])
+
+
+# draws the run strip as a single svg, see run_strips.draw in
+# assets/run_slices.js
+dash.clientside_callback(
+ClientsideFunction(namespace='run_strips', function_name='draw'),
+Output({'type': RUN_STRIP_TYPE, 'index': MATCH}, 'className'),
+Input({'type': RUN_STRIP_DATA_TYPE, 'index': MATCH}, 'data'),
 )
-def navigate_to_run_details(n_clicks):
-    if all([x is None for x in n_clicks]):
-        return dash.no_update
-    if dash.ctx.triggered_id is None:
-        return dash.no_update
-    run_id = dash.ctx.triggered_id['index']
-    return [
-        '/run_details',
-        f'?run_id={run_id}'
-    ]
\ No newline at end of file
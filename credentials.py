@@ -10,4 +10,22 @@ PLOTLY_APP_PATH = os.getenv('PLOTLY_APP_PATH') or '/'
 ORCHA_CORE_USER = os.environ['ORCHA_CORE_USER']
 ORCHA_CORE_PASSWORD = os.environ['ORCHA_CORE_PASSWORD']
 ORCHA_CORE_SERVER = os.environ['ORCHA_CORE_SERVER']
-ORCHA_CORE_DB = os.environ['ORCHA_CORE_DB']
\ No newline at end of file
+ORCHA_CORE_DB = os.environ['ORCHA_CORE_DB']
+
+# seconds between background refreshes of the overview data, 0 to disable
+# and have the overview callbacks always load the data themselves
+OVERVIEW_PREWARM_SECONDS = int(os.getenv('OVERVIEW_PREWARM_SECONDS') or 0)
+
+# where expensive results (overview and lineage models) and the progress of
+# background jobs (bulk cancel, backfill) are kept: 'memory' for this process
+# only, 'kvdb' to share them between workers through the orcha kvdb, or
+# 'file' to keep them in UI_CACHE_DIR. Use kvdb or file with more than one
+# worker, otherwise job progress can't be read from the other workers
+UI_CACHE_BACKEND = os.getenv('UI_CACHE_BACKEND') or 'memory'
+UI_CACHE_DIR = os.getenv('UI_CACHE_DIR')
+# optional directory that results for historical windows spill to
+HISTORICAL_CACHE_DIR = os.getenv('HISTORICAL_CACHE_DIR')
+# key the shared cache entries (kvdb/file) are signed with, so entries
+# written by anyone else are ignored. Defaults to a key derived from the
+# orcha core credentials, set it to rotate the key independently
+UI_CACHE_SECRET = os.getenv('UI_CACHE_SECRET')
@@ -9,6 +9,7 @@ from dash import Input, Output, State, dcc, html
 
 from orcha_ui.credentials import PLOTLY_APP_PATH
 from orcha.utils import kvdb
+from orcha_ui.utils import fingerprint, ui_cache
 
 
 def can_read():
@@ -209,6 +210,8 @@ def layout(key: str | None = None, search: str | None = None):
 	search_value = search or ''
 	return [
 		dcc.Store(id='kv-refresh-signal', data=0),
+		# fingerprint of the entries the client last received
+		dcc.Store(id='kv-content-hash', data=None),
 		html.Div(className='container-fluid', children=[
 			dcc.Interval(id='kv-refresh-interval', interval=60000),
 			html.Div(className='row content-row no-bkg py-0 mt-0 align-items-center', children=[
@@ -359,6 +362,7 @@ def layout(key: str | None = None, search: str | None = None):
 	Output('kv-last-refreshed', 'children'),
 	Output('kv-key-dropdown', 'options'),
 	Output('kv-key-dropdown', 'value'),
+	Output('kv-content-hash', 'data'),
 	Input('kv-filter-search', 'value'),
 	Input('kv-filter-limit', 'value'),
 	Input('kv-filter-include-expired', 'value'),
@@ -366,11 +370,12 @@ def layout(key: str | None = None, search: str | None = None):
 	Input('kv-refresh-interval', 'n_intervals'),
 	Input('kv-refresh-signal', 'data'),
 	State('kv-key-dropdown', 'value'),
+	State('kv-content-hash', 'data'),
 	prevent_initial_call='initial_duplicate'
 )
 def kv_update_entries(
 	    search_text, limit, include_expired_opts, _n_clicks,
-        _n_intervals, _signal, current_value
+        _n_intervals, _signal, current_value, known_hash
     ):
 	include_expired = 'include' in (include_expired_opts or [])
 	try:
@@ -391,6 +396,25 @@ def kv_update_entries(
 			_seconds_only(dt.now()),
 			[],
 			None,
+			None,
+		)
+
+	# the ttl counts down every second, so it is only fingerprinted to the
+	# minute, entries with a ttl are still re-rendered about once a minute
+	content_hash = fingerprint.fingerprint([
+		{
+			**entry,
+			'ttl_seconds': None if entry.get('ttl_seconds') is None else entry['ttl_seconds'] // 60
+		}
+		for entry in entries
+	])
+	if dash.ctx.triggered_id == 'kv-refresh-interval' and content_hash == known_hash:
+		return (
+			dash.no_update,
+			_seconds_only(dt.now()),
+			dash.no_update,
+			dash.no_update,
+			dash.no_update,
 		)
 
 	table = _render_entries_table(entries)
@@ -401,6 +425,7 @@ def kv_update_entries(
 		_seconds_only(dt.now()),
 		options,
 		dropdown_value,
+		content_hash,
 	)
 
 
@@ -534,6 +559,16 @@ def kv_update_entry(
 		)
 
 	if triggered == 'kv-save-button':
+		# only the UI cache itself writes under its prefix (anything it didn't
+		# sign is ignored anyway), its entries can still be deleted to clear it
+		if key.startswith(ui_cache.KVDB_KEY_PREFIX):
+			return (
+				f'Keys starting with "{ui_cache.KVDB_KEY_PREFIX}" are reserved for the UI cache.',
+				'alert alert-warning small',
+				signal_value,
+				dash.no_update,
+				dash.no_update
+			)
 		try:
 			parsed_value = _parse_value(value_text or '', value_mode or 'json')
 		except ValueError as exc:
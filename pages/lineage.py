@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import colorsys
+from datetime import timedelta as td
 from typing import Any
 
 import dash
@@ -8,6 +9,7 @@ from dash import Input, Output, dcc, html
 
 from orcha.core import tasks
 from orcha_ui.credentials import PLOTLY_APP_PATH
+from orcha_ui.utils import fingerprint, task_cache, ui_cache
 
 
 def can_read():
@@ -26,6 +28,9 @@ dash.register_page(
     order=400,
 )
 
+# the lineage only changes when tasks are edited, so it can be reused for a while
+LINEAGE_CACHE_TTL = td(minutes=1)
+
 
 def _is_source(module_type: str | None) -> bool:
     return isinstance(module_type, str) and module_type.lower().startswith("source")
@@ -36,7 +41,7 @@ def _is_sink(module_type: str | None) -> bool:
 
 
 def build_lineage_d3_model(selected_task_ids: set[str] | None = None) -> dict[str, Any]:
-    all_tasks = tasks.TaskItem.get_all()
+    all_tasks = task_cache.get_all_tasks()
     if selected_task_ids:
         all_tasks = [t for t in all_tasks if t.task_idk in selected_task_ids]
 
@@ -245,16 +250,33 @@ def build_lineage_d3_model(selected_task_ids: set[str] | None = None) -> dict[st
     }
 
 
+def get_lineage_model(selected_task_ids: set[str] | None = None) -> dict[str, Any]:
+    all_tasks = task_cache.get_all_tasks()
+    if selected_task_ids:
+        all_tasks = [t for t in all_tasks if t.task_idk in selected_task_ids]
+    # keyed on the task definitions too, so an edited task isn't shown with
+    # the old graph until the entry expires
+    return ui_cache.get_or_compute(
+        key=ui_cache.make_key(
+            "lineage",
+            sorted(selected_task_ids or []),
+            fingerprint.get_tasks_fingerprint(all_tasks),
+        ),
+        ttl=LINEAGE_CACHE_TTL,
+        compute=lambda: build_lineage_d3_model(selected_task_ids),
+    )
+
+
 def layout(hours: int | None = None, start: str | None = None, end: str | None = None, sources: str | None = None):
 
-    all_tasks = tasks.TaskItem.get_all()
+    all_tasks = task_cache.get_all_tasks()
     task_options = [
         {"label": f"{t.name} ({t.task_idk})", "value": t.task_idk}
         for t in all_tasks
     ]
     selected_task_ids = [t.task_idk for t in all_tasks]
 
-    initial_model = build_lineage_d3_model(set(selected_task_ids))
+    initial_model = get_lineage_model(set(selected_task_ids))
     task_order = initial_model.get('task_order') or []
     palette = initial_model.get('palette')
     task_name_map = {str(t.task_idk): (t.name if getattr(t, 'name', None) else str(t.task_idk)) for t in all_tasks}
@@ -322,7 +344,7 @@ def layout(hours: int | None = None, start: str | None = None, end: str | None =
 )
 def update_lineage_graph(selected_task_ids):
     selected = set(selected_task_ids) if selected_task_ids else None
-    model = build_lineage_d3_model(selected)
+    model = get_lineage_model(selected)
     return model
 
 dash.clientside_callback(
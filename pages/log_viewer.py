@@ -4,7 +4,7 @@ from datetime import datetime as dt, timedelta as td
 from typing import Any
 
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State
 
 from orcha_ui.credentials import (
     PLOTLY_APP_PATH
@@ -12,6 +12,7 @@ from orcha_ui.credentials import (
 
 # Use the log structure defined in orcha.utils.log
 from orcha.utils.log import LogManager
+from orcha_ui.utils import fingerprint
 
 
 def can_read():
@@ -159,6 +160,8 @@ def layout(hours: int | None = None, start: str | None = None, end: str | None =
     return [
         html.Div(className='container-fluid', children=[
             dcc.Interval(id='lv-refresh-interval', interval=120000),
+            # fingerprint of the logs the client last received
+            dcc.Store(id='lv-content-hash', data=None),
             html.Div(className='row content-row no-bkg py-0 mt-0 align-items-center', children=[
                 html.Div(className='col-auto', children=[
                     html.Label('Sources', style={'font-weight': 'normal'}),
@@ -252,15 +255,17 @@ def lv_update_refresh_behaviour(end_time):
     Output('lv-last-refreshed', 'children'),
     Output('lv-dd-sources', 'options'),
     Output('lv-dd-sources', 'value'),
+    Output('lv-content-hash', 'data'),
     Input('lv-start-time', 'value'),
     Input('lv-end-time', 'value'),
     Input('lv-dd-sources', 'value'),
     Input('lv-limit', 'value'),
     Input('lv-refresh-button', 'n_clicks'),
     Input('lv-refresh-interval', 'n_intervals'),
+    State('lv-content-hash', 'data'),
     prevent_initial_call='initial_duplicate'
 )
-def lv_update_logs(start_time, end_time, selected_sources, limit, _n_clicks, _n_intervals):
+def lv_update_logs(start_time, end_time, selected_sources, limit, _n_clicks, _n_intervals, known_hash):
     # Validate and coerce inputs
     try:
         start_dt = _parse_local_dt(start_time)
@@ -298,6 +303,17 @@ def lv_update_logs(start_time, end_time, selected_sources, limit, _n_clicks, _n_
 
     # Query logs and render
     entries = _query_logs(start_dt, end_dt, selected_sources, limit_val)
+    # skip re-rendering (and re-sending) the table if the logs haven't changed
+    content_hash = fingerprint.fingerprint(all_sources, selected_sources, entries)
+    if dash.ctx.triggered_id == 'lv-refresh-interval' and content_hash == known_hash:
+        return (
+            dash.no_update,
+            _seconds_only(dt.now()),
+            dash.no_update,
+            dash.no_update,
+            dash.no_update,
+        )
+
     content = [
         html.Div(className='row content-row', children=[
             html.Div(className='col-12', children=[
@@ -312,4 +328,5 @@ def lv_update_logs(start_time, end_time, selected_sources, limit, _n_clicks, _n_
         _seconds_only(dt.now()),
         src_options,
         selected_sources,
+        content_hash,
     )
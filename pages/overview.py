@@ -4,11 +4,37 @@ from datetime import datetime as dt
 from datetime import timedelta as td
 
 import dash
-from dash import Input, Output, dcc, html, State
+from dash import ALL, MATCH, Input, Output, Patch, dcc, html, State
 
-from orcha.core import tasks, scheduler
-from orcha_ui.components import run_slices_cmp, collapsible_div_cmp
+from orcha.core import tasks
+from orcha_ui.components import run_slices_cmp, collapsible_div_cmp, live_events_cmp
 from orcha_ui.credentials import PLOTLY_APP_PATH
+from orcha_ui.utils import (
+    fingerprint,
+    overview_prewarm,
+    schedule_cache,
+    task_cache,
+    ui_cache,
+)
+from orcha_ui.utils.overview_data import (
+    OVERVIEW_CACHE_TTL,
+    RECENT_RUN_COUNT,
+    OverviewData,
+    is_window_settled,
+    load_overview_data,
+    load_scheduler_heartbeat,
+    sort_summary_tasks,
+)
+
+# each workspace container is rendered by its own callback once the overview
+# block has been sent, see render_workspace
+WORKSPACE_BODY_TYPE = 'ov-workspace-body'
+WORKSPACE_REQUEST_TYPE = 'ov-workspace-request'
+WORKSPACE_RENDER_TYPE = 'ov-workspace-render'
+# set by render_workspace once the workspace's task elements are in place
+WORKSPACE_RENDERED_TYPE = 'ov-workspace-rendered'
+# also checked for by the clientside callback in front of render_workspace
+WORKSPACE_PLACEHOLDER_CLASS = 'ov-workspace-placeholder'
 
 
 def can_read():
@@ -40,12 +66,14 @@ def get_task_opacity(task: tasks.TaskItem):
         return 'opacity-50'
 
 
-def create_tasks_overview(
-        tasks: list[tasks.TaskItem],
-        runs: dict[str, list[tasks.RunItem]]
-    ):
-    sched_last_active = scheduler.Scheduler.get_last_active()
-    sched_loaded_at = scheduler.Scheduler.get_loaded_at()
+def _run_version(run: tasks.RunItem):
+    return (
+        run.run_idk, run.status, run.progress,
+        run.start_time, run.end_time, run.last_active
+    )
+
+
+def create_scheduler_card(sched_last_active: dt | None, sched_loaded_at: dt | None):
 
     if sched_last_active is None:
         sched_last_active_text = 'Not Active'
@@ -66,160 +94,206 @@ def create_tasks_overview(
             uptime = _seconds_only(dt.now() - sched_loaded_at)
             uptime_class = ''
 
-    elements = [
-        html.Div(className='col-auto py-2 pe-5', children=[
-            html.Div(className='row', children=[
-                html.Div(className='col-auto', children=[
-                    html.Div(
-                        'Scheduler',
-                        className='task-link h5'
-                    )
-                ])
+    return html.Div(className='col-auto py-2 pe-5', children=[
+        html.Div(className='row', children=[
+            html.Div(className='col-auto', children=[
+                html.Div(
+                    'Scheduler',
+                    className='task-link h5'
+                )
+            ])
+        ]),
+        html.Div(className='row', children=[
+            html.Div(className='col-auto', children=[
+                html.Span('Started'),
             ]),
-            html.Div(className='row', children=[
-                html.Div(className='col-auto', children=[
-                    html.Span('Started'),
-                ]),
-                html.Div(className='col-auto', children=[
-                    html.P(
-                        uptime,
-                        className=uptime_class
-                    )
-                ])
+            html.Div(className='col-auto', children=[
+                html.P(
+                    uptime,
+                    className=uptime_class
+                )
+            ])
+        ]),
+        html.Div(className='row', children=[
+            html.Div(className='col-auto', children=[
+                html.Span('Last Active'),
             ]),
-            html.Div(className='row', children=[
-                html.Div(className='col-auto', children=[
-                    html.Span('Last Active'),
-                ]),
-                html.Div(className='col-auto', children=[
-                    html.P(
-                        sched_last_active_text,
-                        className=last_active_class
-                    )
-                ])
+            html.Div(className='col-auto', children=[
+                html.P(
+                    sched_last_active_text,
+                    className=last_active_class
+                )
             ])
         ])
-    ]
-    tasks = sorted(tasks, key=lambda x: (
-        x.task_metadata.get('workspace', 'No Workspace'),
-        x.name
-    ), reverse=False)
-    for task in tasks:
-        next_scheduled_text = _seconds_only(task.get_next_scheduled_time())
-        if task.status == 'disabled':
-            next_scheduled_text = 'Disabled'
-        elif task.status == 'inactive':
-            next_scheduled_text = 'Inactive'
-        elif task.status == 'error':
-            next_scheduled_text = 'Error'
-
-        task_active_class = 'text-success'
-        if task.last_active < (dt.now() - td(minutes=2)):
-            task_active_class = 'text-danger'
-
-        error_cls = ''
-        if task.status == 'error':
-            error_cls = 'error-card'
-
-        # sort by scheduled time
-        runs[task.task_idk].sort(key=lambda x: x.scheduled_time)
-        # then get latest 5
-        task_runs = runs[task.task_idk][-5:]
-        active_runs = task.get_running_runs()
-        base_classes = f'col-auto py-2 pe-5 {get_task_opacity(task)} {error_cls}'
-        if task.task_metadata.get('workspace', 'No Workspace') == 'No Workspace':
-            workspace_str = ''
-        else:
-            workspace_str = f' ({task.task_metadata.get("workspace", "No Workspace")})'
+    ])
 
-        width = '120px'
-        elements.append(html.Div(className=base_classes, children=[
-            html.Div(className='row', children=[
-                html.Div(className='col-auto', children=[
-                    dcc.Link(
-                        f'{task.name}{workspace_str}',
-                        href=f'/task_details?task_id={task.task_idk}',
-                        className='task-link h5'
-                    )
-                ])
-            ]),
-            html.Div(className='row', children=[
-                html.Div(className='col-auto', children=[
-                    html.Div('Last Active', style={'width': width}, className='d-inline-block'),
-                ]),
-                html.Div(className='col-auto', children=[
-                    html.Span(
-                        _seconds_only(dt.now() - task.last_active),
-                        className=task_active_class
-                    )
-                ])
+
+def get_task_live_values(task: tasks.TaskItem):
+    """
+    Returns the parts of a task summary card that change on every refresh
+    (time since last active and time until next scheduled) as
+    (last_active_text, last_active_class, next_scheduled_text).
+    """
+    next_scheduled_text = _seconds_only(
+        schedule_cache.get_time_until_next_fire(task)
+    )
+    if task.status == 'disabled':
+        next_scheduled_text = 'Disabled'
+    elif task.status == 'inactive':
+        next_scheduled_text = 'Inactive'
+    elif task.status == 'error':
+        next_scheduled_text = 'Error'
+
+    task_active_class = 'text-success'
+    if task.last_active < (dt.now() - td(minutes=2)):
+        task_active_class = 'text-danger'
+
+    return (
+        _seconds_only(dt.now() - task.last_active),
+        task_active_class,
+        next_scheduled_text
+    )
+
+
+def get_task_summary_version(
+        task: tasks.TaskItem,
+        task_runs: list[tasks.RunItem],
+        active_runs: list[tasks.RunItem]
+    ) -> str:
+    return fingerprint.fingerprint(
+        task.name,
+        task.status,
+        task.task_metadata.get('workspace', 'No Workspace'),
+        [_run_version(run) for run in task_runs],
+        [_run_version(run) for run in active_runs],
+    )
+
+
+def create_task_summary_card(
+        task: tasks.TaskItem,
+        task_runs: list[tasks.RunItem],
+        active_runs: list[tasks.RunItem]
+    ):
+    last_active_text, task_active_class, next_scheduled_text = get_task_live_values(task)
+
+    error_cls = ''
+    if task.status == 'error':
+        error_cls = 'error-card'
+
+    base_classes = f'col-auto py-2 pe-5 {get_task_opacity(task)} {error_cls}'
+    if task.task_metadata.get('workspace', 'No Workspace') == 'No Workspace':
+        workspace_str = ''
+    else:
+        workspace_str = f' ({task.task_metadata.get("workspace", "No Workspace")})'
+
+    width = '120px'
+    # NOTE: the positions of the last active span and the next scheduled
+    # text are relied on by _patch_task_live_values, data-task-id is used
+    # by the clientside filtering
+    return html.Div(className=base_classes, **{'data-task-id': task.task_idk}, children=[
+        html.Div(className='row', children=[
+            html.Div(className='col-auto', children=[
+                dcc.Link(
+                    f'{task.name}{workspace_str}',
+                    href=f'/task_details?task_id={task.task_idk}',
+                    className='task-link h5'
+                )
+            ])
+        ]),
+        html.Div(className='row', children=[
+            html.Div(className='col-auto', children=[
+                html.Div('Last Active', style={'width': width}, className='d-inline-block'),
             ]),
-            html.Div(className='row', children=[
-                html.Div(className='col-auto', children=[
-                    html.Div('Last Run', style={'width': width}, className='d-inline-block'),
-                ]),
-                html.Div(className='col-auto', children=[
-                    html.Span(
-                        _seconds_only(task_runs[-1:][0].scheduled_time)
-                        if len(task_runs) > 0 else 'N/A'
-                    )
-                ])
+            html.Div(className='col-auto', children=[
+                html.Span(
+                    last_active_text,
+                    className=task_active_class
+                )
+            ])
+        ]),
+        html.Div(className='row', children=[
+            html.Div(className='col-auto', children=[
+                html.Div('Last Run', style={'width': width}, className='d-inline-block'),
             ]),
-            html.Div(className='row pb-1', children=[
-                html.Div(className='col-auto', children=[
-                    html.Div('Next Scheduled', style={'width': width}, className='d-inline-block'),
-                ]),
-                html.Div(className='col-auto', children=[
-                    next_scheduled_text
-                ])
+            html.Div(className='col-auto', children=[
+                html.Span(
+                    _seconds_only(task_runs[-1:][0].scheduled_time)
+                    if len(task_runs) > 0 else 'N/A'
+                )
+            ])
+        ]),
+        html.Div(className='row pb-1', children=[
+            html.Div(className='col-auto', children=[
+                html.Div('Next Scheduled', style={'width': width}, className='d-inline-block'),
             ]),
-            run_slices_cmp.create_run_slice_row_bunched(
-                title_div=html.Div(
-                    'Active Runs',
-                    style={'width': width},
-                ),
-                task_runs=active_runs
+            html.Div(className='col-auto', children=[
+                next_scheduled_text
+            ])
+        ]),
+        run_slices_cmp.create_run_slice_row_bunched(
+            title_div=html.Div(
+                'Active Runs',
+                style={'width': width},
             ),
-            run_slices_cmp.create_run_slice_row_bunched(
-                title_div=html.Div(
-                    'Recent Runs',
-                    style={'width': width, 'font-weight': 600},
-                ),
-                task_runs=task_runs
+            task_runs=active_runs,
+            lazy_tooltips=True
+        ),
+        run_slices_cmp.create_run_slice_row_bunched(
+            title_div=html.Div(
+                'Recent Runs',
+                style={'width': width, 'font-weight': 600},
             ),
-        ]))
+            task_runs=task_runs,
+            lazy_tooltips=True
+        ),
+    ])
+
 
+def create_tasks_overview(data: OverviewData):
     return html.Div(className='row content-row', children=[
         html.Div(className='col-12', children=[
             html.H4('Overview')
         ]),
-        *elements
+        create_scheduler_card(data.scheduler_last_active, data.scheduler_loaded_at),
+        *[
+            create_task_summary_card(
+                task=task,
+                task_runs=data.latest_runs[task.task_idk],
+                active_runs=data.active_runs[task.task_idk]
+            )
+            for task in data.summary_tasks
+        ]
     ])
 
+
+def get_task_element_version(
+        task: tasks.TaskItem,
+        all_runs: list[tasks.RunItem]
+    ) -> str:
+    return fingerprint.fingerprint(
+        fingerprint.get_task_definition(task),
+        [_run_version(run) for run in all_runs],
+    )
+
+
 def create_task_element(
         task: tasks.TaskItem,
         all_runs: list[tasks.RunItem],
         display_start_time: dt,
-        display_end_time: dt,
-        display_count: int
+        display_end_time: dt
     ):
 
-    all_runs.sort(key=lambda x: x.scheduled_time)
     all_runs = [
         run
-        for run in all_runs
+        for run in sorted(all_runs, key=lambda x: x.scheduled_time)
         if (
             run.scheduled_time >= display_start_time
             and run.scheduled_time <= display_end_time
         )
     ]
 
-    # want to count all runs for the display window
-    all_run_count = len(all_runs)
-    # and then limit to the display count
-    all_runs = all_runs[-display_count:]
 
-    return html.Div(className='row content-row', children=[
+    return html.Div(className='row content-row', **{'data-task-id': task.task_idk}, children=[
         html.Div(className=f'col-12 {get_task_opacity(task)}', children=[
             html.Div(className='row', children=[
                 dcc.Link(
@@ -245,81 +319,304 @@ def create_task_element(
             ]),
             html.Div(className='row', children=[
                 html.Div(className='col-12', children=[
-                    f'Displaying {len(all_runs)} of {all_run_count} runs'
+                    f'Displaying {len(all_runs)} runs'
                 ]),
             ]),
-            run_slices_cmp.create_run_slice_row(
-                task=task,
+            run_slices_cmp.create_run_strip(
+                strip_id=f'ov-{task.task_idk}',
                 all_runs=all_runs,
-                display_count=display_count,
                 display_start_time=display_start_time,
                 display_end_time=display_end_time
             )
         ])
     ])
 
-def create_all_task_elements(
-        all_tasks: list[tasks.TaskItem],
-        display_start_time: dt,
-        display_end_time: dt
+
+def get_task_list_versions(data: OverviewData) -> dict:
+    """
+    Returns the versions describing what a client holds after receiving the
+    task list for `data`. 'layout' changes whenever the structure of the task
+    list changes (window, which tasks and their order), the per-task versions
+    change whenever what is rendered for that task changes.
+    """
+    return {
+        'layout': fingerprint.fingerprint(
+            data.display_start_time,
+            data.display_end_time,
+            [task.task_idk for task in data.summary_tasks],
+            [
+                (workspace, [task.task_idk for task in workspace_tasks])
+                for workspace, workspace_tasks in data.workspaces
+            ],
+        ),
+        'summary': {
+            task.task_idk: get_task_summary_version(
+                task=task,
+                task_runs=data.latest_runs[task.task_idk],
+                active_runs=data.active_runs[task.task_idk]
+            )
+            for task in data.summary_tasks
+        },
+        'elements': {
+            task.task_idk: get_task_element_version(
+                task=task,
+                all_runs=data.window_runs[task.task_idk]
+            )
+            for task in data.summary_tasks
+        },
+        # what ov-live-trigger needs to tell whether a changed run is shown,
+        # the window and the scheduled time of the oldest run in each task's
+        # recent runs (None while it shows fewer than RECENT_RUN_COUNT)
+        'window': [
+            data.display_start_time.isoformat(),
+            data.display_end_time.isoformat(),
+        ],
+        'latest_since': {
+            task.task_idk: (
+                data.latest_runs[task.task_idk][0].scheduled_time.isoformat()
+                if len(data.latest_runs[task.task_idk]) >= RECENT_RUN_COUNT
+                else None
+            )
+            for task in data.summary_tasks
+        },
+    }
+
+
+def create_workspace_elements(
+        data: OverviewData,
+        workspace_tasks: list[tasks.TaskItem]
     ):
-    task_runs: dict[str, list[tasks.RunItem]] = {}
-    for task in all_tasks:
-        task_runs[task.task_idk] = tasks.RunItem.get_all(
+    return [
+        create_task_element(
             task=task,
-            schedule=None,
-            since=(dt.now() - td(days=10))
+            all_runs=data.window_runs[task.task_idk],
+            display_start_time=data.display_start_time,
+            display_end_time=data.display_end_time
         )
+        for task in workspace_tasks
+    ]
+
 
-    max_runs = 500
-    max_per_task = 200
-    runs_per_task: dict[str, int] = {}
+def get_workspace_container_id(workspace: str) -> str:
+    # stable so the collapse state of a workspace is remembered
+    return f'ov-workspace:{workspace}'
 
+
+def create_workspace_placeholder():
+    return [
+        html.Div(
+            'Loading runs...',
+            className=f'{WORKSPACE_PLACEHOLDER_CLASS} text-muted py-2'
+        )
+    ]
+
+
+def get_workspace_elements(container):
+    """
+    Returns the location of the task elements within a workspace container
+    created by create_all_task_elements, e.g. to update them with a dash.Patch
+    """
+    return collapsible_div_cmp.get_container_children(container)[0]['props']['children']
+
+
+def create_workspace_request(
+        data: OverviewData,
+        data_fingerprint: str | None,
+        workspace: str
+    ) -> dict:
+    return {
+        'workspace': workspace,
+        'start': data.display_start_time.isoformat(),
+        'end': data.display_end_time.isoformat(),
+        # None when served from the pre-warmed snapshot
+        'data': data_fingerprint,
+    }
+
+
+def create_all_task_elements(
+        data: OverviewData,
+        data_fingerprint: str | None,
+        collapse_state: dict | None
+    ):
+    """
+    Creates the overview block and an empty container per workspace. The
+    task elements of each workspace are then rendered by render_workspace,
+    so the overview shows before the (much larger) run strips are built.
+    Collapsed workspaces aren't rendered until they're expanded.
+    """
     task_elements = []
-    task_elements.append(create_tasks_overview(
-        tasks=all_tasks,
-        runs=task_runs
-    ))
-
-    total_runs = 0
-    for _, runs in task_runs.items():
-        total_runs += len(runs)
-
-    if total_runs > max_runs:
-        for task_idk, runs in task_runs.items():
-            runs_per_task[task_idk] = min(int(len(runs) * max_runs / total_runs), max_per_task)
-
-    # Order the tasks by workspace name
-    all_tasks.sort(key=lambda x: x.task_metadata.get('workspace', 'Other'))
-    all_workspaces = ['No Workspace']
-    for task in all_tasks:
-        workspace = task.task_metadata.get('workspace', 'No Workspace')
-        if workspace not in all_workspaces:
-            all_workspaces.append(workspace)
-
-    for workspace in all_workspaces:
-        workspace_tasks = [
-            task for task in all_tasks
-            if workspace == task.task_metadata.get('workspace', 'No Workspace')
-        ]
-        workspace_elements = [
-            create_task_element(
-                task=task,
-                all_runs=task_runs[task.task_idk],
-                display_count=runs_per_task.get(task.task_idk, 100),
-                display_start_time=display_start_time,
-                display_end_time=display_end_time
-            )
-            for task in workspace_tasks
-        ]
+    task_elements.append(create_tasks_overview(data))
+
+    for workspace, _ in data.workspaces:
+        container_id = get_workspace_container_id(workspace)
+        request = create_workspace_request(data, data_fingerprint, workspace)
         task_elements.append(collapsible_div_cmp.create_collapsible_container(
-            children=workspace_elements,
+            children=[
+                html.Div(
+                    className='col-12',
+                    id={'type': WORKSPACE_BODY_TYPE, 'index': container_id},
+                    children=create_workspace_placeholder()
+                ),
+                dcc.Store(id={'type': WORKSPACE_REQUEST_TYPE, 'index': container_id}, data=request),
+                dcc.Store(id={'type': WORKSPACE_RENDER_TYPE, 'index': container_id}, data=None),
+                dcc.Store(id={'type': WORKSPACE_RENDERED_TYPE, 'index': container_id}, data=False),
+            ],
             title=workspace,
-            className='pt-3 pb-1 border-bottom'
+            className='pt-3 pb-1 border-bottom',
+            attributes={'data-workspace': workspace},
+            container_id=container_id,
+            collapsed=collapsible_div_cmp.is_collapsed(collapse_state, container_id)
         ))
 
     return task_elements
 
+
+def _patch_task_live_values(card: Patch, task: tasks.TaskItem):
+    last_active_text, task_active_class, next_scheduled_text = get_task_live_values(task)
+    last_active_span = card['props']['children'][1]['props']['children'][1]['props']['children'][0]['props']
+    last_active_span['children'] = last_active_text
+    last_active_span['className'] = task_active_class
+    card['props']['children'][3]['props']['children'][1]['props']['children'] = [next_scheduled_text]
+
+
+def create_live_values_patch(
+        summary_tasks: list[tasks.TaskItem],
+        sched_last_active: dt | None,
+        sched_loaded_at: dt | None
+    ) -> Patch:
+    """
+    Creates a partial update of a task list that is otherwise current, only
+    updating the scheduler card and the relative times on the task cards.
+    """
+    task_list = Patch()
+    overview_cards = task_list[0]['props']['children']
+    overview_cards[1] = create_scheduler_card(sched_last_active, sched_loaded_at)
+    for index, task in enumerate(summary_tasks):
+        _patch_task_live_values(overview_cards[index + 2], task)
+    return task_list
+
+
+def create_task_list_patch(
+        data: OverviewData,
+        data_fingerprint: str | None,
+        known_versions: dict,
+        rendered_workspaces: set[str]
+    ) -> Patch:
+    """
+    Creates a partial update of a task list the client already holds, only
+    re-sending the task cards whose version differs from `known_versions`.
+    Only valid when known_versions['layout'] matches the layout of `data`.
+    Only the workspaces in `rendered_workspaces` (container ids) are patched,
+    the others go back to a placeholder.
+    """
+    versions = get_task_list_versions(data)
+    task_list = Patch()
+
+    # the overview block is [title, scheduler card, *task summary cards]
+    overview_cards = task_list[0]['props']['children']
+    overview_cards[1] = create_scheduler_card(
+        data.scheduler_last_active, data.scheduler_loaded_at
+    )
+    for index, task in enumerate(data.summary_tasks):
+        card = overview_cards[index + 2]
+        if versions['summary'][task.task_idk] != known_versions['summary'].get(task.task_idk):
+            overview_cards[index + 2] = create_task_summary_card(
+                task=task,
+                task_runs=data.latest_runs[task.task_idk],
+                active_runs=data.active_runs[task.task_idk]
+            )
+        else:
+            _patch_task_live_values(card, task)
+
+    # followed by one collapsible container per workspace
+    for ws_index, (workspace, workspace_tasks) in enumerate(data.workspaces):
+        changed_tasks = [
+            (index, task)
+            for index, task in enumerate(workspace_tasks)
+            if versions['elements'][task.task_idk] != known_versions['elements'].get(task.task_idk)
+        ]
+        if len(changed_tasks) == 0:
+            continue
+        # workspaces that are collapsed, or whose render hasn't finished, hold
+        # a placeholder (or are about to be overwritten), so rather than
+        # patching them they go back to a placeholder and are rendered again
+        # with this data once shown
+        if get_workspace_container_id(workspace) not in rendered_workspaces:
+            workspace_children = collapsible_div_cmp.get_container_children(
+                task_list[ws_index + 1]
+            )
+            workspace_children[0]['props']['children'] = create_workspace_placeholder()
+            workspace_children[1]['props']['data'] = create_workspace_request(
+                data, data_fingerprint, workspace
+            )
+            workspace_children[3]['props']['data'] = False
+            continue
+        container_children = get_workspace_elements(task_list[ws_index + 1])
+        for index, task in changed_tasks:
+            container_children[index] = create_task_element(
+                task=task,
+                all_runs=data.window_runs[task.task_idk],
+                display_start_time=data.display_start_time,
+                display_end_time=data.display_end_time
+            )
+
+    return task_list
+
+
+def get_overview_fingerprint(
+        all_tasks: list[tasks.TaskItem],
+        display_start_time: dt,
+        display_end_time: dt
+    ) -> str:
+    return fingerprint.fingerprint(
+        fingerprint.get_runs_fingerprint(
+            task_list=all_tasks,
+            since=display_start_time,
+            until=display_end_time,
+            # the window's runs come from the historical cache once settled
+            window_settled=is_window_settled(display_end_time)
+        ),
+        fingerprint.get_tasks_fingerprint(all_tasks),
+        display_start_time,
+        display_end_time
+    )
+
+
+def load_cached_overview_data(
+        all_tasks: list[tasks.TaskItem],
+        display_start_time: dt,
+        display_end_time: dt,
+        data_fingerprint: str,
+        refresh: bool = False
+    ) -> OverviewData:
+    """
+    Shares the overview data between clients (and workers with a shared
+    cache backend), keyed on the fingerprint so a cached result is never
+    older than the data behind it.
+    """
+    return ui_cache.get_or_compute(
+        key=ui_cache.make_key('overview', data_fingerprint),
+        ttl=OVERVIEW_CACHE_TTL,
+        compute=lambda: load_overview_data(
+            all_tasks=all_tasks,
+            display_start_time=display_start_time,
+            display_end_time=display_end_time
+        ),
+        refresh=refresh
+    )
+
+
+def get_cached_overview_data(data_fingerprint: str) -> OverviewData | None:
+    """
+    Returns the overview data cached by load_cached_overview_data for the
+    fingerprint, without computing it on a miss.
+    """
+    found, data = ui_cache.get_cache().get(
+        ui_cache.make_key('overview', data_fingerprint)
+    )
+    return data if found else None
+
+
 def layout(
         hours: int | None = None,
         types: str | None = None,
@@ -355,6 +652,14 @@ def layout(
     return [
         html.Div(className='container-fluid', children=[
             dcc.Interval(id='ov-refresh-interval', interval=30000),
+            # versions of what is currently in ov-task-list, used to only
+            # send the changed task cards on refresh
+            dcc.Store(id='ov-task-versions', data=None),
+            # set when a pushed change event affects a shown task
+            dcc.Store(id='ov-live-trigger', data=None),
+            live_events_cmp.create_live_events_listener(),
+            # tags/workspace/status per task for the clientside filtering
+            dcc.Store(id='ov-task-index', data=None),
             html.Div(className='row content-row no-bkg py-0 mt-0 align-items-center', children=[
                 html.Div(className='col-auto', children=[
                     html.Label('Workspaces', style={'font-weight': 'normal'}),
@@ -442,6 +747,9 @@ def layout(
         dcc.Loading(
             id='ov-loading-tasks',
             className='pt-5',
+            # workspaces render into their own containers as they're ready,
+            # only spin while the task list itself is being (re)built
+            target_components={'ov-task-list': 'children'},
             children=[
                 html.Div(
                     className='container-fluid',
@@ -485,108 +793,335 @@ def update_refresh_button(end_time):
     else:
         return False, 30000
 
-# populate ov-task-list
+# populate ov-task-list, this renders every task for the time window and
+# the filters are applied clientside (see filter_task_list below)
 @dash.callback(
     Output('ov-task-list', 'children', allow_duplicate=True),
     Output('ov-end-time', 'value'),
     Output('ov-last-refreshed', 'children'),
-    Output('app-location-norefresh', 'search'),
     Output('ov-dd-task-types', 'options'),
     Output('ov-dd-task-workspaces', 'options'),
-    Output('ov-dd-task-workspaces', 'value'),
+    Output('ov-task-versions', 'data'),
+    Output('ov-task-index', 'data'),
     Input('ov-end-time', 'value'),
     Input('ov-lookback-hours', 'value'),
     Input('ov-refresh-button', 'n_clicks'),
-    Input('ov-show-disabled', 'value'),
-    Input('ov-dd-task-types', 'value'),
-    Input('ov-dd-task-workspaces', 'value'),
     Input('ov-refresh-interval', 'n_intervals'),
+    Input('ov-live-trigger', 'data'),
+    State('ov-task-versions', 'data'),
+    State(collapsible_div_cmp.COLLAPSE_STATE_ID, 'data'),
+    State({'type': WORKSPACE_RENDERED_TYPE, 'index': ALL}, 'id'),
+    State({'type': WORKSPACE_RENDERED_TYPE, 'index': ALL}, 'data'),
     prevent_initial_call=True,
 )
 def update_task_list(
-        end_time, lookback_hours, refresh_clicks,
-        show_disabled, task_types, workspaces, n_intervals
+        end_time, lookback_hours, refresh_clicks, n_intervals,
+        live_trigger, known_versions, collapse_state,
+        rendered_ids, rendered_flags
     ):
     if end_time is None:
         return dash.no_update
     if lookback_hours is None:
         lookback_hours = 6
 
-    # if the end time isn't within the last 10 seconds, then add it to the url
-    # as we're using a static end time
-    if dt.strptime(end_time, '%Y-%m-%dT%H:%M') < (dt.now() - td(minutes=1)):
-        endtime_str = f'&end_time={end_time}'
-    else:
-        endtime_str = ''
-
     display_end_time = dt.strptime(end_time, '%Y-%m-%dT%H:%M')
     display_start_time = display_end_time - td(hours=lookback_hours)
 
-    all_tasks = tasks.TaskItem.get_all()
-    all_tags:list[str] = ['all']
-    for task in all_tasks:
-        all_tags.extend(task.task_tags)
-
-    # only keep tasks with the selected type
-    filtered_tasks = set()
-    if 'all' not in task_types:
-        for task in all_tasks:
-            for tag in task.task_tags:
-                if tag in task_types:
-                    filtered_tasks.add(task)
-                    break
+    # keep the snapshot order so the task list layout is stable between
+    # refreshes, which the partial updates below rely on
+    catalog = task_cache.get_catalog()
+    all_tasks = catalog.tasks
+
+    # what the clientside filtering needs, only re-sent when it changes
+    task_index = dict(catalog.filter_index)
+    task_index['hours'] = lookback_hours
+    # if the end time isn't within the last minute, then it is added to the
+    # url as we're using a static end time
+    task_index['end_time'] = end_time if display_end_time < (dt.now() - td(minutes=1)) else None
+    index_version = fingerprint.fingerprint(task_index)
+    if known_versions and known_versions.get('index') == index_version:
+        task_index = dash.no_update
+        tag_options = dash.no_update
+        workspace_options = dash.no_update
     else:
-        filtered_tasks = all_tasks
-
-    if not workspaces:
-        workspaces = ['All Workspaces']
-    # if we have selected at least one workspace, then we don't want
-    # then remove the 'All Workspaces' option so we don't show the tasks
-    # from the unselected workspaces
-    if 'All Workspaces' in workspaces and len(workspaces) > 1:
-        workspaces.remove('All Workspaces')
-
-    all_workspaces = set()
-    all_workspaces.add('All Workspaces')
-    # Loop through all tasks to get all workspaces
-    for task in all_tasks:
-        workspace = task.task_metadata.get('workspace', 'No Workspace')
-        all_workspaces.add(workspace)
-
-    # but need to further filter down the filtered tasks list
-    if 'All Workspaces' not in workspaces:
-        filtered_tasks = [
-            task
-            for task in filtered_tasks
-            if task.task_metadata.get('workspace', 'No Workspace') in workspaces
-        ]
+        tag_options = catalog.tag_options
+        workspace_options = catalog.workspace_options
 
-    # We still want to show inactive tasks so the user can deal with them
-    if 'show_disabled' not in show_disabled:
-        filtered_tasks = [
-            task
-            for task in filtered_tasks
-            if task.status != 'disabled' and task.status != 'deleted'
-        ]
+    # serve from the background snapshot when it covers this window, but
+    # not when asked for the latest data, as it can be a refresh behind
+    data = None
+    if dash.ctx.triggered_id not in ['ov-refresh-button', 'ov-live-trigger']:
+        data = overview_prewarm.get_overview_data(
+            all_tasks=all_tasks,
+            display_start_time=display_start_time,
+            display_end_time=display_end_time
+        )
+    data_fingerprint = None
+    if data is None:
+        data_fingerprint = get_overview_fingerprint(
+            all_tasks=all_tasks,
+            display_start_time=display_start_time,
+            display_end_time=display_end_time
+        )
+        # if nothing behind the task list has changed since the client last
+        # received it, only the relative times need to be updated
+        if (
+            dash.ctx.triggered_id == 'ov-refresh-interval'
+            and known_versions
+            and known_versions.get('data') == data_fingerprint
+        ):
+            return (
+                create_live_values_patch(
+                    sort_summary_tasks(all_tasks),
+                    *load_scheduler_heartbeat()
+                ),
+                end_time,
+                _seconds_only(dt.now()),
+                tag_options,
+                workspace_options,
+                dash.no_update,
+                task_index
+            )
 
-    # calculate the url string separately to make it easier to read
-    hours_str = f'&hours={str(lookback_hours)}'
-    types_str = '&types='
-    types_str += ','.join(task_types) if task_types else 'all'
-    workspace_str = '&workspaces='
-    workspace_str += ','.join(workspaces) if workspaces else 'No Workspace'
+        data = load_cached_overview_data(
+            all_tasks=all_tasks,
+            display_start_time=display_start_time,
+            display_end_time=display_end_time,
+            data_fingerprint=data_fingerprint,
+            refresh=dash.ctx.triggered_id == 'ov-refresh-button'
+        )
+    versions = get_task_list_versions(data)
+    versions['data'] = data_fingerprint
+    versions['index'] = index_version
 
+    # refreshes only send the task cards that changed since the client
+    # last received the task list, anything else rebuilds the whole list
+    is_refresh = dash.ctx.triggered_id in [
+        'ov-refresh-interval', 'ov-refresh-button', 'ov-live-trigger'
+    ]
+    if (
+        is_refresh
+        and known_versions
+        and known_versions.get('layout') == versions['layout']
+    ):
+        rendered_workspaces = {
+            rendered_id['index']
+            for rendered_id, rendered in zip(rendered_ids or [], rendered_flags or [])
+            if rendered
+        }
+        task_list = create_task_list_patch(
+            data, data_fingerprint, known_versions, rendered_workspaces
+        )
+    else:
+        task_list = create_all_task_elements(data, data_fingerprint, collapse_state)
 
     return (
-        create_all_task_elements(
-            all_tasks=list(filtered_tasks),
-            display_start_time=display_start_time,
-            display_end_time=display_end_time
-        ),
+        task_list,
         end_time,
         _seconds_only(dt.now()),
-        f'?{workspace_str}{types_str}{hours_str}{endtime_str}',
-        [{'label': tag, 'value': tag} for tag in set(all_tags)],
-        [{'label': ws, 'value': ws} for ws in all_workspaces],
-        workspaces
+        tag_options,
+        workspace_options,
+        versions,
+        task_index
     )
+
+
+# hides the tasks (and workspaces) that don't match the filters with a
+# stylesheet rather than re-rendering, so changing a filter never goes to
+# the server. Being a stylesheet, it also survives the task list updates
+dash.clientside_callback(
+    """
+    function(taskTypes, workspaces, showDisabled, index) {
+        const noUpdate = window.dash_clientside.no_update;
+        if (!index) {
+            return [noUpdate, noUpdate];
+        }
+        let selectedWorkspaces = (workspaces && workspaces.length) ? workspaces.slice() : ['All Workspaces'];
+        // if we have selected at least one workspace, then remove the
+        // 'All Workspaces' option so we don't show the unselected ones
+        if (selectedWorkspaces.length > 1 && selectedWorkspaces.includes('All Workspaces')) {
+            selectedWorkspaces = selectedWorkspaces.filter((ws) => ws !== 'All Workspaces');
+        }
+        const selectedTypes = taskTypes || [];
+        const allTypes = selectedTypes.includes('all');
+        const allWorkspaces = selectedWorkspaces.includes('All Workspaces');
+        const includeHidden = (showDisabled || []).includes('show_disabled');
+
+        const hiddenSelectors = [];
+        const shownWorkspaces = new Set(['No Workspace']);
+        for (const [taskIdk, [tags, workspace, status]] of Object.entries(index.tasks)) {
+            const shown = (allTypes || tags.some((tag) => selectedTypes.includes(tag)))
+                && (allWorkspaces || selectedWorkspaces.includes(workspace))
+                && (includeHidden || !index.hidden_statuses.includes(status));
+            if (shown) {
+                shownWorkspaces.add(workspace);
+            } else {
+                hiddenSelectors.push('#ov-task-list [data-task-id="' + CSS.escape(taskIdk) + '"]');
+            }
+        }
+        for (const workspace of index.workspaces) {
+            if (!shownWorkspaces.has(workspace)) {
+                hiddenSelectors.push('#ov-task-list [data-workspace="' + CSS.escape(workspace) + '"]');
+            }
+        }
+
+        let style = document.getElementById('ov-filter-style');
+        if (!style) {
+            style = document.createElement('style');
+            style.id = 'ov-filter-style';
+            document.head.appendChild(style);
+        }
+        style.textContent = hiddenSelectors.length
+            ? hiddenSelectors.join(', ') + ' { display: none !important; }'
+            : '';
+
+        const search = '?workspaces=' + selectedWorkspaces.join(',')
+            + '&types=' + (selectedTypes.length ? selectedTypes.join(',') : 'all')
+            + '&hours=' + index.hours
+            + (index.end_time ? '&end_time=' + index.end_time : '');
+        const workspacesChanged = !workspaces
+            || workspaces.length !== selectedWorkspaces.length;
+        return [search, workspacesChanged ? selectedWorkspaces : noUpdate];
+    }
+    """,
+    Output('app-location-norefresh', 'search'),
+    Output('ov-dd-task-workspaces', 'value'),
+    Input('ov-dd-task-types', 'value'),
+    Input('ov-dd-task-workspaces', 'value'),
+    Input('ov-show-disabled', 'value'),
+    Input('ov-task-index', 'data'),
+)
+
+
+# only refresh the task list for pushed events that change what is shown:
+# changed tasks, and status changes of runs in the window, in a task's
+# recent runs or in its active runs. Heartbeats of running runs are left to
+# the refresh interval, and the refreshes are at most one per 10 seconds,
+# any changes in between are picked up by a single trailing refresh
+dash.clientside_callback(
+    """
+    function(event, versions) {
+        const noUpdate = window.dash_clientside.no_update;
+        if (!event || !versions) {
+            return noUpdate;
+        }
+        const shown = versions.summary || {};
+        const latestSince = versions.latest_since || {};
+        const windowStart = versions.window ? versions.window[0] : null;
+        const windowEnd = versions.window ? versions.window[1] : null;
+        // iso formatted times compare correctly as strings
+        const isShown = (run) => {
+            if (!run.status_changed || !(run.task_idk in shown)) {
+                return false;
+            }
+            if (run.active || !run.scheduled_time || !windowStart) {
+                return true;
+            }
+            const since = latestSince[run.task_idk];
+            return (run.scheduled_time >= windowStart && run.scheduled_time <= windowEnd)
+                || !since
+                || run.scheduled_time >= since;
+        };
+        const changed = event.tasks.some((task_idk) => task_idk in shown)
+            || event.runs.some(isShown);
+        if (!changed) {
+            return noUpdate;
+        }
+
+        const minGapMs = 10000;
+        const state = window.ovLiveTriggerState || (window.ovLiveTriggerState = {
+            last: 0, timer: null, pending: null
+        });
+        const wait = state.last + minGapMs - Date.now();
+        if (wait <= 0) {
+            state.last = Date.now();
+            return event.id;
+        }
+        state.pending = event.id;
+        if (!state.timer) {
+            state.timer = setTimeout(() => {
+                state.timer = null;
+                // the overview may have been left in the meantime
+                if (!document.getElementById('ov-task-list')) {
+                    return;
+                }
+                state.last = Date.now();
+                window.dash_clientside.set_props('ov-live-trigger', {data: state.pending});
+            }, wait);
+        }
+        return noUpdate;
+    }
+    """,
+    Output('ov-live-trigger', 'data'),
+    Input('app-live-events', 'data'),
+    State('ov-task-versions', 'data'),
+    prevent_initial_call=True,
+)
+
+
+# any update of ov-task-list re-runs the initial callbacks of everything in
+# it, so only ask the server for a workspace while it is still a placeholder,
+# and not while it is collapsed (expanding it triggers this again)
+dash.clientside_callback(
+    """
+    function(request, containerClass, children) {
+        const first = Array.isArray(children) ? children[0] : children;
+        const className = (first && first.props && first.props.className) || '';
+        if (
+            !request
+            || (containerClass || '').includes('d-none')
+            || !className.includes('ov-workspace-placeholder')
+        ) {
+            return window.dash_clientside.no_update;
+        }
+        return request;
+    }
+    """,
+    Output({'type': WORKSPACE_RENDER_TYPE, 'index': MATCH}, 'data'),
+    Input({'type': WORKSPACE_REQUEST_TYPE, 'index': MATCH}, 'data'),
+    Input({'type': collapsible_div_cmp.COLLAPSIBLE_DIV_TYPE, 'index': MATCH}, 'className'),
+    State({'type': WORKSPACE_BODY_TYPE, 'index': MATCH}, 'children'),
+)
+
+
+# renders the task elements of one workspace, each workspace is a separate
+# request so they show as they're ready rather than all at once
+@dash.callback(
+    Output({'type': WORKSPACE_BODY_TYPE, 'index': MATCH}, 'children'),
+    Output({'type': WORKSPACE_RENDERED_TYPE, 'index': MATCH}, 'data'),
+    Input({'type': WORKSPACE_RENDER_TYPE, 'index': MATCH}, 'data'),
+    prevent_initial_call=True,
+)
+def render_workspace(request):
+    if not request:
+        return dash.no_update
+    display_start_time = dt.fromisoformat(request['start'])
+    display_end_time = dt.fromisoformat(request['end'])
+    all_tasks = task_cache.get_all_tasks()
+
+    if request['data'] is not None:
+        # normally still cached from building the task list. only read here,
+        # the fingerprint may be stale by the time the workspace is expanded
+        data = get_cached_overview_data(request['data'])
+    else:
+        data = overview_prewarm.get_overview_data(
+            all_tasks=all_tasks,
+            display_start_time=display_start_time,
+            display_end_time=display_end_time
+        )
+    if data is None:
+        # recomputed, so cached under the current fingerprint rather than the
+        # one the request was made with
+        data = load_cached_overview_data(
+            all_tasks=all_tasks,
+            display_start_time=display_start_time,
+            display_end_time=display_end_time,
+            data_fingerprint=get_overview_fingerprint(
+                all_tasks=all_tasks,
+                display_start_time=display_start_time,
+                display_end_time=display_end_time
+            )
+        )
+
+    workspace_tasks = dict(data.workspaces).get(request['workspace'], [])
+    return create_workspace_elements(data, workspace_tasks), True
@@ -8,9 +8,9 @@ import dash
 from dash import dcc, html
 
 from orcha.core import tasks
-from orcha_ui.components import modal_cmp
+from orcha_ui.components import live_events_cmp, modal_cmp
 from orcha_ui.credentials import PLOTLY_APP_PATH
-from orcha_ui.utils import format_dt
+from orcha_ui.utils import fingerprint, format_dt, single_flight, task_cache
 
 
 def can_read():
@@ -49,11 +49,7 @@ def create_run_detail_rows(run: tasks.RunItem | None):
 
     schedule_div = ''
     if run.run_type == 'scheduled':
-        s_set = None
-        for s in run._task.schedule_sets:
-            if s.set_idk == run.set_idf:
-                s_set = s
-                break
+        s_set = task_cache.get_schedule_index(run._task).get(run.set_idf)
         if s_set:
             schedule_div = html.Div(className='col', children=[
                 html.H6('Schedule'),
@@ -222,7 +218,7 @@ def create_run_detail_rows(run: tasks.RunItem | None):
 
 
 def get_run_dropdown_options(task_idk: str):
-    task = tasks.TaskItem.get(task_idk)
+    task = task_cache.get_task(task_idk)
     if task is None:
         return []
     runs = tasks.RunItem.get_all(
@@ -247,12 +243,14 @@ def layout(run_id: str = ''):
     run = tasks.RunItem.get(run_id)
     run_options = get_run_dropdown_options(run.task_idf) if run else []
 
-    all_tasks = tasks.TaskItem.get_all()
+    all_tasks = task_cache.get_all_tasks()
 
     task_dropdown_value = run.task_idf if run else ''
 
     # if the run isn't 'finished' then we want a higher update interval
-    # but if its done then there really isnt anything to update
+    # but if its done then there really isnt anything to update. Once a
+    # pushed event arrives (see the clientside callback at the end) changes
+    # come through app-live-events and this drops to 30 seconds
     interval_ms = 10000
     if run is not None:
         if (run.progress == 'running'):
@@ -291,6 +289,10 @@ def layout(run_id: str = ''):
 
     return [
         dcc.Interval(id='rd-update-interval', interval=interval_ms),
+        dcc.Store(id='rd-live-trigger', data=None),
+        live_events_cmp.create_live_events_listener(),
+        # fingerprint of the run (and the task's runs) the client last received
+        dcc.Store(id='rd-content-hash', data=None),
         html.Div(className='col-auto', children=[
             top_dropdown_row,
         ]),
@@ -409,21 +411,43 @@ def update_runs_dropdown(task_idk, run_id):
     dash.Output('rd-col-run-details', 'children', allow_duplicate=True),
     dash.Output('app-location-norefresh', 'search', allow_duplicate=True),
     dash.Output('rd-runs-dropdown', 'options', allow_duplicate=True),
+    dash.Output('rd-content-hash', 'data'),
     dash.Input('rd-runs-dropdown', 'value'),
     dash.Input('rd-update-interval', 'n_intervals'),
+    dash.Input('rd-live-trigger', 'data'),
+    dash.State('rd-content-hash', 'data'),
     prevent_initial_call=True
 )
-def update_run_details(run_idk, n_intervals):
+def update_run_details(run_idk, n_intervals, live_trigger, known_hash):
     if not run_idk:
         return dash.no_update
-    run = tasks.RunItem.get(run_idk)
+    # everyone watching this run ticks at about the same time
+    run = single_flight.call(tasks.RunItem.get, run_idk)
     if run is None:
         return dash.no_update
 
+    task = task_cache.get_task(run.task_idf)
+    content_hash = fingerprint.fingerprint(
+        run_idk, run.status, run.progress, run.start_time, run.end_time,
+        run.last_active, run.output,
+        fingerprint.get_runs_fingerprint(
+            task_list=[task] if task else [],
+            since=dt.now() - td(days=30)
+        )
+    )
+    # running runs show elapsed times, so are always re-rendered
+    if (
+        dash.ctx.triggered_id == 'rd-update-interval'
+        and run.progress != 'running'
+        and content_hash == known_hash
+    ):
+        return dash.no_update
+
     return [
         create_run_detail_rows(run),
         f'?run_id={run_idk}',
-        get_run_dropdown_options(run.task_idf)
+        get_run_dropdown_options(run.task_idf),
+        content_hash
     ]
 
 
@@ -456,4 +480,25 @@ def cancel_run(n_clicks, run_idk):
         create_run_detail_rows(run),
         f'?run_id={run_idk}',
         get_run_dropdown_options(run.task_idf)
-    ]
\ No newline at end of file
+    ]
+
+# only refresh the run details for pushed events about the selected run. Any
+# event arriving shows the stream works, so the polling is slowed down to
+# 30 seconds, a fallback for the elapsed times
+dash.clientside_callback(
+    """
+    function(event, run_idk) {
+        const no_update = window.dash_clientside.no_update;
+        if (!event) {
+            return [no_update, no_update];
+        }
+        const changed = run_idk && event.runs.some((run) => run.run_idk === run_idk);
+        return [changed ? event.id : no_update, 30000];
+    }
+    """,
+    dash.Output('rd-live-trigger', 'data'),
+    dash.Output('rd-update-interval', 'interval'),
+    dash.Input('app-live-events', 'data'),
+    dash.State('rd-runs-dropdown', 'value'),
+    prevent_initial_call=True,
+)
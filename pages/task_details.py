@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import json
+import math
+import re
 from datetime import datetime as dt
 from datetime import timedelta as td
 
@@ -11,6 +13,16 @@ from dash import Input, Output, State, dcc, html
 from orcha.core import tasks
 from orcha_ui.components import autoclear_cpm, run_slices_cmp
 from orcha_ui.credentials import PLOTLY_APP_PATH
+from orcha_ui.utils import (
+    background_jobs,
+    backfill,
+    bulk_cancel,
+    fingerprint,
+    run_queries,
+    schedule_cache,
+    task_cache,
+)
+from orcha_ui.utils.task_catalog import ScheduleSetIndex
 
 from orcha_ui.components import modal_cmp
 
@@ -31,6 +43,39 @@ dash.register_page(
     order=300,
 )
 
+# how many upcoming fire times are listed per schedule set
+NEXT_FIRE_TIME_COUNT = 5
+# rows per page of the run history, each page is loaded from the database
+RUN_HISTORY_PAGE_SIZE = 50
+# run history columns and the run column each is sorted/filtered on
+RUN_HISTORY_FIELDS = {
+    'Run ID': 'run_idk',
+    'Schedule': 'set_idf',
+    'Status': 'status',
+    'Scheduled Time': 'scheduled_time',
+    'Start Time': 'start_time',
+    'End Time': 'end_time',
+}
+RUN_HISTORY_DATETIME_FIELDS = ('scheduled_time', 'start_time', 'end_time')
+RUN_HISTORY_DEFAULT_SORT = [{'column_id': 'Scheduled Time', 'direction': 'desc'}]
+# how often the progress of a bulk cancel or backfill is checked
+JOB_PROGRESS_INTERVAL_MS = 1000
+# (in progress, done) text for each kind of background job
+JOB_TEXTS = {
+    'cancel': ('Cancelling unstarted runs', 'Cancelled {count} unstarted runs'),
+    'backfill': ('Creating backfill runs', 'Created {count} backfill runs'),
+}
+# a single DataTable filter expression, e.g. {Status} scontains failed
+_FILTER_PART_RE = re.compile(
+    r'^\{(?P<column>[^}]+)\}\s+'
+    # with an optional s/i prefix for case (in)sensitive, which is ignored
+    r'[si]?(?P<operator>eq|ne|lt|le|gt|ge|contains|datestartswith|>=|<=|!=|=|<|>)\s+'
+    r'(?P<value>.+)$'
+)
+_FILTER_OPERATOR_NAMES = {
+    'eq': '=', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>=',
+}
+
 
 def get_run_css_class(run: tasks.RunItem):
     if run.progress == 'queued':
@@ -47,51 +92,144 @@ def get_run_css_class(run: tasks.RunItem):
         return 'run-unknown'
 
 
-def create_run_history_table(task: tasks.TaskItem, all_runs: list[tasks.RunItem]):
-    data = []
-    all_runs.sort(key=lambda r: r.scheduled_time, reverse=True)
-    for run in all_runs:
-        if run.run_type == 'manual':
-            schedule_text = 'Manual'
+def _get_date_prefix_range(value: str) -> tuple[dt, dt] | None:
+    # the range of times starting with a (partial) date, e.g. 2024-05
+    value = value.replace('T', ' ')
+    try:
+        if len(value) == 4:
+            start = dt(int(value), 1, 1)
+            return start, start.replace(year=start.year + 1)
+        if len(value) == 7:
+            start = dt.strptime(value, '%Y-%m')
+            return start, (start + td(days=32)).replace(day=1)
+        if len(value) == 10:
+            start = dt.strptime(value, '%Y-%m-%d')
+            return start, start + td(days=1)
+        if len(value) == 13:
+            start = dt.strptime(value, '%Y-%m-%d %H')
+            return start, start + td(hours=1)
+        if len(value) == 16:
+            start = dt.strptime(value, '%Y-%m-%d %H:%M')
+            return start, start + td(minutes=1)
+        start = dt.fromisoformat(value)
+        return start, start + td(seconds=1)
+    except ValueError:
+        return None
+
+
+def parse_run_history_filters(filter_query: str | None) -> list[tuple[str, str, object]]:
+    """
+    Converts a DataTable filter query into run_queries.get_run_history_page
+    filters. Raises a ValueError for expressions that can't be applied in
+    the database (e.g. on the schedule text, or unparsable dates), rather
+    than showing the table as filtered when it isn't.
+    """
+    filters: list[tuple[str, str, object]] = []
+    for part in (filter_query or '').split(' && '):
+        part = part.strip()
+        if not part:
+            continue
+        match = _FILTER_PART_RE.match(part)
+        if match is None:
+            raise ValueError(f'Can\'t filter on {part}')
+        field = RUN_HISTORY_FIELDS.get(match['column'])
+        if field is None or field == 'set_idf':
+            # the schedule is shown as its cron text, which isn't stored
+            # with the runs
+            raise ValueError(f'Can\'t filter on the {match["column"]} column')
+        operator = _FILTER_OPERATOR_NAMES.get(match['operator'], match['operator'])
+        value = match['value'].strip()
+        if len(value) > 1 and value[0] == value[-1] and value[0] in '"\'`':
+            value = value[1:-1]
+
+        if field not in RUN_HISTORY_DATETIME_FIELDS:
+            if operator == 'datestartswith':
+                operator = 'contains'
+            filters.append((field, operator, value))
+            continue
+        date_range = _get_date_prefix_range(value)
+        if date_range is None:
+            raise ValueError(f'Can\'t filter on {part}, {value} isn\'t a date')
+        # a (partial) date covers [start, end), e.g. <= 2024-05-01 includes
+        # the whole day and > 2024-05-01 starts the day after
+        if operator in ['datestartswith', 'contains', '=']:
+            filters.append((field, '>=', date_range[0]))
+            filters.append((field, '<', date_range[1]))
+        elif operator in ['<', '>=']:
+            filters.append((field, operator, date_range[0]))
+        elif operator == '<=':
+            filters.append((field, '<', date_range[1]))
+        elif operator == '>':
+            filters.append((field, '>=', date_range[1]))
         else:
-            if run.set_idf is None:
-                schedule_text = 'No Schedules'
-            else:
-                s_set = task.get_schedule_set(run.set_idf)
-                if s_set is not None:
-                    schedule_text = s_set.cron_schedule
-                else:
-                    schedule_text = 'Unknown'
-        data.append({
-            'Run ID': run.run_idk,
-            'Schedule': schedule_text,
-            'Status': run.status,
-            'Scheduled Time': run.scheduled_time,
-            'Start Time': run.start_time,
-            'End Time': run.end_time,
-        })
+            raise ValueError(f'Can\'t filter on {part}')
+    return filters
+
+
+def create_run_history_row(
+        schedule_index: ScheduleSetIndex,
+        run: tasks.RunItem
+    ) -> dict:
+    return {
+        'Run ID': run.run_idk,
+        'Schedule': schedule_index.get_run_label(run),
+        'Status': run.status,
+        'Scheduled Time': run.scheduled_time,
+        'Start Time': run.start_time,
+        'End Time': run.end_time,
+    }
+
 
+def create_run_history_table():
+    """
+    Creates the run history table, its pages are loaded as they're shown
+    (see update_run_history) so the task's whole history can be browsed.
+    """
     columns = [
-        {'name': 'Run ID', 'id': 'Run ID'},
-        {'name': 'Schedule', 'id': 'Schedule'},
-        {'name': 'Status', 'id': 'Status'},
-        {'name': 'Scheduled Time', 'id': 'Scheduled Time'},
-        {'name': 'Start Time', 'id': 'Start Time'},
-        {'name': 'End Time', 'id': 'End Time'}
+        {
+            'name': name,
+            'id': name,
+            'type': 'datetime' if field in RUN_HISTORY_DATETIME_FIELDS else 'text'
+        }
+        for name, field in RUN_HISTORY_FIELDS.items()
     ]
 
     return html.Div(className='col-12', children=[
+        # the last row of each page loaded so far, see update_run_history
+        dcc.Store(id='td-run-history-cursors', data=None),
+        # set to reload the shown page after runs are changed
+        dcc.Store(id='td-run-history-refresh', data=None),
         dash_table.DataTable(
-            data=data,
+            id='td-run-history-table',
+            data=[],
             columns=columns,
+            page_action='custom',
+            page_current=0,
+            page_size=RUN_HISTORY_PAGE_SIZE,
+            sort_action='custom',
+            sort_mode='single',
+            sort_by=RUN_HISTORY_DEFAULT_SORT,
+            filter_action='custom',
+            filter_query='',
             # fixed_rows={'headers': True},
             style_table={'height': '400px'},
             style_cell={'textAlign': 'left'},
             style_header={'fontWeight': 'bold'}
-        )
+        ),
+        # why a filter couldn't be applied
+        html.Div(id='td-run-history-message', className='text-danger'),
     ])
 
 
+def get_toggle_button(status: str) -> tuple[str, str]:
+    """
+    Returns the (text, className) of the enable/disable button.
+    """
+    if status == 'enabled':
+        return 'Disable Task', 'btn btn-sm btn-danger'
+    return 'Enable Task', 'btn btn-sm btn-primary'
+
+
 def create_task_element(task: tasks.TaskItem):
 
     all_runs = tasks.RunItem.get_all(
@@ -100,24 +238,15 @@ def create_task_element(task: tasks.TaskItem):
         schedule=None
     )
     all_runs.sort(key=lambda r: r.scheduled_time)
-    all_runs = all_runs[-200:]
 
-    if task.status == 'enabled':
-        toggle_buttton = html.Button(
-            id='td-btn-toggle-task',
-            className='btn btn-sm btn-danger',
-            children=[
-                'Disable Task'
-            ]
-        )
-    else:
-        toggle_buttton = html.Button(
-            id='td-btn-toggle-task',
-            className='btn btn-sm btn-primary',
-            children=[
-                'Enable Task'
-            ]
-        )
+    toggle_text, toggle_class = get_toggle_button(task.status)
+    toggle_buttton = html.Button(
+        id='td-btn-toggle-task',
+        className=toggle_class,
+        children=[
+            toggle_text
+        ]
+    )
 
     trigger_run_elements: dict[str | None, list] = {}
     for sset in task.schedule_sets:
@@ -146,6 +275,13 @@ def create_task_element(task: tasks.TaskItem):
                 html.Div(className='col-auto', children=[
                     html.H6('Frequency'),
                     html.P(s.cron_schedule),
+                    html.H6('Next Runs'),
+                    *[
+                        html.P(fire_time.strftime('%Y-%m-%d %H:%M:%S'))
+                        for fire_time in schedule_cache.get_next_fire_times(
+                            s, count=NEXT_FIRE_TIME_COUNT
+                        )
+                    ],
                     html.H6('Config'),
                     html.Pre(json.dumps(s.config, indent=4)),
                     html.H6('Trigger Runs'),
@@ -210,7 +346,7 @@ def create_task_element(task: tasks.TaskItem):
             ]),
             html.Div(className='col-auto', children=[
                 html.H6('Status'),
-                html.Div(task.status),
+                html.Div(task.status, id='td-task-status'),
             ]),
             html.Div(className='col-auto', children=[
                 html.H6('Last Active'),
@@ -229,12 +365,11 @@ def create_task_element(task: tasks.TaskItem):
                 html.H6('Recent Runs')
             ]),
         ]),
-        run_slices_cmp.create_run_slice_row(
-            task=task,
+        run_slices_cmp.create_run_strip(
+            strip_id='td-recent-runs',
             all_runs=all_runs,
             display_start_time=dt.now() - td(days=2),
             display_end_time=dt.now(),
-            display_count=200,
         ),
         # add a row to create a manual run
         html.Div(className='row pt-5', children=[
@@ -286,6 +421,50 @@ def create_task_element(task: tasks.TaskItem):
                 })
             ])
         ]),
+        # backfill manual runs for the selected schedule over a time range
+        html.Div(
+            className='d-none' if len(task_schedules) == 0 else 'row pt-3',
+            children=[
+                html.Div(className='col-12', children=[
+                    html.H6('Backfill'),
+                    html.P(
+                        'Creates a manual run with the config above for every '
+                        'time the selected schedule fires within the range.'
+                    ),
+                ]),
+                html.Div(className='col-auto', children=['From']),
+                html.Div(className='col-auto', children=[
+                    dcc.Input(id='td-backfill-since', type='datetime-local'),
+                ]),
+                html.Div(className='col-auto', children=['To']),
+                html.Div(className='col-auto', children=[
+                    dcc.Input(id='td-backfill-until', type='datetime-local'),
+                ]),
+                html.Div(className='col-auto', children=['Runs per Second']),
+                html.Div(className='col-auto', children=[
+                    dcc.Input(
+                        id='td-backfill-rate',
+                        type='number',
+                        min=1,
+                        value=backfill.DEFAULT_RUNS_PER_SECOND,
+                        style={'width': '80px'}
+                    ),
+                ]),
+                html.Div(className='col-auto', children=[
+                    html.Button(
+                        'Preview',
+                        id='td-btn-backfill-preview',
+                        className='btn btn-secondary btn-sm me-2'
+                    ),
+                    html.Button(
+                        'Backfill',
+                        id='td-btn-backfill',
+                        className='btn btn-primary btn-sm'
+                    ),
+                ]),
+                html.Div(className='col-auto', id='td-backfill-preview'),
+            ]
+        ),
         # create run histoy table
         html.Div(className='row pt-5', children=[
             html.Div(className='col-12', children=[
@@ -293,15 +472,15 @@ def create_task_element(task: tasks.TaskItem):
             ])
         ]),
         html.Div(className='row overflow-scroll', children=[
-            create_run_history_table(task, all_runs)
+            create_run_history_table()
         ]),
     ]
 
 
 def layout(task_id: str = ''):
 
-    all_tasks = tasks.TaskItem.get_all()
-    task = tasks.TaskItem.get(task_id)
+    all_tasks = task_cache.get_all_tasks()
+    task = task_cache.get_task(task_id)
 
     task_dropdown_value = task_id if task_id else ''
 
@@ -335,6 +514,25 @@ def layout(task_id: str = ''):
                 'type': modal_cmp.BUTTON_OK_TYPE,
                 'index': 'td-cancel-unstarted-modal'
             }),
+            dcc.Store(id='td-run-history-cursors', data=None),
+            dcc.Store(id='td-run-history-refresh', data=None),
+            html.Div(className='d-none', children=[
+                dash_table.DataTable(id='td-run-history-table', data=[]),
+            ]),
+            html.Div(className='d-none', id='td-run-history-message'),
+            html.P(className='d-none', id='td-cancel-scope-count'),
+            html.Div(className='d-none', children=[
+                dcc.Dropdown(id='td-cancel-scope-schedule'),
+            ]),
+            dcc.Input(className='d-none', id='td-cancel-scope-since'),
+            dcc.Input(className='d-none', id='td-cancel-scope-until'),
+            dcc.Input(className='d-none', id='td-backfill-since'),
+            dcc.Input(className='d-none', id='td-backfill-until'),
+            dcc.Input(className='d-none', id='td-backfill-rate'),
+            html.Button(className='d-none', id='td-btn-backfill-preview'),
+            html.Button(className='d-none', id='td-btn-backfill'),
+            html.Div(className='d-none', id='td-backfill-preview'),
+            html.Div(className='d-none', id='td-task-status'),
         ]
 
     return [
@@ -362,6 +560,14 @@ def layout(task_id: str = ''):
                 show=False
             ),
             html.Div(id='td-div-modal-area'),
+            # progress of a bulk cancel or backfill, {'id', 'kind'}
+            dcc.Store(id='td-job', data=None),
+            dcc.Interval(
+                id='td-job-progress-interval',
+                interval=JOB_PROGRESS_INTERVAL_MS,
+                disabled=True
+            ),
+            html.Div(id='td-job-progress', className='row'),
             html.Div(className='row content-row no-bkg py-0 align-items-center', children=[
                 html.Div(className='col-auto', children=[
                     html.Div('Select Task')
@@ -389,11 +595,9 @@ def layout(task_id: str = ''):
 @dash.callback(
     Output('td-task-details', 'children'),
     Input('td-task-dropdown', 'value'),
-    Input('td-btn-toggle-task', 'n_clicks'),
-    Input({'type': autoclear_cpm.AUTOCLEAR_ID_TYPE, 'index': 'td-out-create-run'}, 'children'),
     prevent_initial_call=True,
 )
-def update_task_details(task_id, toggle_clicks, create_run_output):
+def update_task_details(task_id):
     task = tasks.TaskItem.get(task_id)
     if task is None:
         return [
@@ -401,15 +605,108 @@ def update_task_details(task_id, toggle_clicks, create_run_output):
                 html.H3('Task not found'),
             ])
         ]
-    if dash.ctx.triggered_id == 'td-btn-toggle-task':
-        if task.status == 'enabled':
-            task.set_status('disabled', 'Manually disabled')
-        else:
-            task.set_status('enabled', 'Manually enabled')
-
     return create_task_element(task)
 
 
+# enable/disable the task, only updating the button and the status
+@dash.callback(
+    Output('td-btn-toggle-task', 'children'),
+    Output('td-btn-toggle-task', 'className'),
+    Output('td-task-status', 'children'),
+    Input('td-btn-toggle-task', 'n_clicks'),
+    State('td-task-dropdown', 'value'),
+    prevent_initial_call=True,
+)
+def toggle_task(n_clicks, task_id):
+    if n_clicks is None:
+        return dash.no_update
+    task = tasks.TaskItem.get(task_id)
+    if task is None:
+        return dash.no_update
+    if task.status == 'enabled':
+        task.set_status('disabled', 'Manually disabled')
+    else:
+        task.set_status('enabled', 'Manually enabled')
+    task_cache.invalidate()
+
+    toggle_text, toggle_class = get_toggle_button(task.status)
+    return [toggle_text], toggle_class, task.status
+
+
+# load the shown page of the run history table
+@dash.callback(
+    Output('td-run-history-table', 'data'),
+    Output('td-run-history-table', 'page_count'),
+    Output('td-run-history-table', 'page_current'),
+    Output('td-run-history-cursors', 'data'),
+    Output('td-run-history-message', 'children'),
+    Input('td-run-history-table', 'page_current'),
+    Input('td-run-history-table', 'page_size'),
+    Input('td-run-history-table', 'sort_by'),
+    Input('td-run-history-table', 'filter_query'),
+    Input('td-run-history-refresh', 'data'),
+    State('td-task-dropdown', 'value'),
+    State('td-run-history-cursors', 'data'),
+)
+def update_run_history(
+        page_current, page_size, sort_by, filter_query, refresh,
+        task_id, cursors
+    ):
+    task = task_cache.get_task(task_id)
+    if task is None:
+        return [], 1, 0, None, ''
+    page_current = page_current or 0
+    page_size = page_size or RUN_HISTORY_PAGE_SIZE
+    # a new filter or sort starts from the first page again
+    if any(
+        prop_id.endswith(('.filter_query', '.sort_by'))
+        for prop_id in dash.ctx.triggered_prop_ids
+    ):
+        page_current = 0
+
+    sort_column = 'scheduled_time'
+    descending = True
+    if sort_by:
+        sort_column = RUN_HISTORY_FIELDS.get(sort_by[0]['column_id'], sort_column)
+        descending = sort_by[0]['direction'] == 'desc'
+
+    # paging to the next page continues from the last row of the page before
+    # rather than counting through every earlier run, the cursors are only
+    # valid for the same task, sort and filters
+    cursor_key = fingerprint.fingerprint(
+        task.task_idk, sort_column, descending, filter_query, page_size
+    )
+    if not cursors or cursors.get('key') != cursor_key:
+        cursors = {'key': cursor_key, 'pages': {}}
+    after = cursors['pages'].get(str(page_current - 1))
+    if after is not None and sort_column in RUN_HISTORY_DATETIME_FIELDS:
+        after = [dt.fromisoformat(after[0]), after[1]]
+
+    try:
+        filters = parse_run_history_filters(filter_query)
+    except ValueError as e:
+        return [], 1, 0, cursors, str(e)
+    runs, total = run_queries.get_run_history_page(
+        task=task,
+        page_size=page_size,
+        sort_column=sort_column,
+        descending=descending,
+        filters=filters,
+        offset=page_current * page_size,
+        after=tuple(after) if after is not None else None,
+    )
+    if len(runs) > 0:
+        last_value = getattr(runs[-1], sort_column)
+        cursors['pages'][str(page_current)] = [
+            last_value.isoformat() if isinstance(last_value, dt) else last_value,
+            runs[-1].run_idk
+        ]
+
+    schedule_index = task_cache.get_schedule_index(task)
+    data = [create_run_history_row(schedule_index, run) for run in runs]
+    return data, max(1, math.ceil(total / page_size)), page_current, cursors, ''
+
+
 # update the config textarea
 @dash.callback(
     Output('td-config-textarea', 'value'),
@@ -443,6 +740,50 @@ def update_config_textarea(schedule_id, task_id):
     ]
 
 
+def _parse_datetime_input(value: str | None) -> dt | None:
+    if not value:
+        return None
+    try:
+        return dt.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def get_cancel_scope(set_idk: str | None, since: str | None, until: str | None) -> dict:
+    """
+    Converts the cancel modal inputs into bulk_cancel arguments.
+    """
+    return {
+        'set_idk': set_idk or None,
+        'since': _parse_datetime_input(since),
+        'until': _parse_datetime_input(until),
+    }
+
+
+def create_job_progress(kind: str, progress: dict | None):
+    in_progress_text, done_text = JOB_TEXTS[kind]
+    if progress is None:
+        # e.g. another worker is running the job and the cache isn't shared
+        text = (
+            f'{in_progress_text} in the background, but its progress can\'t '
+            'be read from this worker. Set UI_CACHE_BACKEND to kvdb or file '
+            'when running more than one worker'
+        )
+        class_name = 'text-warning'
+    elif progress['error']:
+        text = f'{in_progress_text} failed after {progress["count"]}: {progress["error"]}'
+        class_name = 'text-danger'
+    elif progress['done']:
+        text = done_text.format(count=progress['count'])
+        class_name = 'text-success'
+    else:
+        text = f'{in_progress_text}: {progress["count"]} / {progress["total"]}'
+        class_name = ''
+    return html.Div(className='col-12', children=[
+        html.Span(text, className=class_name)
+    ])
+
+
 # show fail modal
 @dash.callback(
     Output('td-div-modal-area', 'children'),
@@ -457,15 +798,41 @@ def show_cancel_modal(n_clicks, task_id):
         task = tasks.TaskItem.get(task_id)
         if task is None:
             run_count = 0
+            schedule_options = []
         else:
-            run_count = len(task.get_queued_runs())
+            run_count = bulk_cancel.count_unstarted_runs(task)
+            schedule_options = [
+                {'label': s.cron_schedule, 'value': s.set_idk}
+                for s in task.schedule_sets
+            ]
         return modal_cmp.create_modal(
-            inner_html=html.Div(
+            inner_html=html.Div([
                 html.P(
                     f'Cancel {run_count} unstarted runs?',
+                    id='td-cancel-scope-count',
                     className='fs-5'
-                )
-            ),
+                ),
+                # optionally only cancel some of them
+                html.Label('Schedule'),
+                dcc.Dropdown(
+                    id='td-cancel-scope-schedule',
+                    options=schedule_options,
+                    placeholder='All schedules',
+                    value=None
+                ),
+                html.Label('Scheduled From', className='pt-2'),
+                dcc.Input(
+                    id='td-cancel-scope-since',
+                    type='datetime-local',
+                    className='form-control'
+                ),
+                html.Label('Scheduled To', className='pt-2'),
+                dcc.Input(
+                    id='td-cancel-scope-until',
+                    type='datetime-local',
+                    className='form-control'
+                ),
+            ]),
             outer_style={
                 'background-color': 'white',
                 'padding': '20px',
@@ -477,34 +844,175 @@ def show_cancel_modal(n_clicks, task_id):
             show=True
         )
 
-# cancel all unstarted runs
+# recount the runs to cancel when the scope changes
 @dash.callback(
-    Output({'type': autoclear_cpm.AUTOCLEAR_ID_TYPE, 'index': 'td-out-create-run'}, 'children', allow_duplicate=True),
+    Output('td-cancel-scope-count', 'children'),
+    Input('td-cancel-scope-schedule', 'value'),
+    Input('td-cancel-scope-since', 'value'),
+    Input('td-cancel-scope-until', 'value'),
+    State('td-task-dropdown', 'value'),
+    prevent_initial_call=True,
+)
+def update_cancel_count(set_idk, since, until, task_id):
+    task = task_cache.get_task(task_id)
+    if task is None:
+        return dash.no_update
+    run_count = bulk_cancel.count_unstarted_runs(task, **get_cancel_scope(set_idk, since, until))
+    return f'Cancel {run_count} unstarted runs?'
+
+# cancel the unstarted runs in the background, see poll_job_progress
+@dash.callback(
+    Output('td-job', 'data', allow_duplicate=True),
+    Output('td-job-progress-interval', 'disabled', allow_duplicate=True),
+    Output('td-job-progress', 'children', allow_duplicate=True),
     Input({'type': modal_cmp.BUTTON_OK_TYPE, 'index': 'td-cancel-unstarted-modal'}, 'n_clicks'),
     State('td-task-dropdown', 'value'),
+    State('td-cancel-scope-schedule', 'value'),
+    State('td-cancel-scope-since', 'value'),
+    State('td-cancel-scope-until', 'value'),
     prevent_initial_call=True,
 )
-def cancel_unstarted_runs(ok_clicks, task_id):
+def cancel_unstarted_runs(ok_clicks, task_id, set_idk, since, until):
     if ok_clicks is None:
         return dash.no_update
     task = tasks.TaskItem.get(task_id)
     if task is None:
-        return 'No task selected'
-    unstarted_runs = task.get_queued_runs()
-    for run in unstarted_runs:
-        run.set_status(
-            'cancelled',
-            output={'message': 'Unstarted runs manually cancelled'}
-        )
-        run.set_progress(
-            progress='complete',
-            zero_duration=True
-        )
-    return 'Unstarted runs cancelled'
+        return None, True, html.Div('No task selected', className='col-12')
+    job_id = bulk_cancel.start_cancel_job(task, **get_cancel_scope(set_idk, since, until))
+    return (
+        {'id': job_id, 'kind': 'cancel'},
+        False,
+        create_job_progress('cancel', background_jobs.get_job_progress(job_id))
+    )
+
+# report the progress of a bulk cancel or backfill, reloading the run
+# history once it's done
+@dash.callback(
+    Output('td-job-progress', 'children', allow_duplicate=True),
+    Output('td-job-progress-interval', 'disabled', allow_duplicate=True),
+    Output({'type': autoclear_cpm.AUTOCLEAR_ID_TYPE, 'index': 'td-out-create-run'}, 'children', allow_duplicate=True),
+    Output('td-run-history-refresh', 'data', allow_duplicate=True),
+    Input('td-job-progress-interval', 'n_intervals'),
+    State('td-job', 'data'),
+    prevent_initial_call=True,
+)
+def poll_job_progress(n_intervals, job):
+    if not job:
+        return dash.no_update, True, dash.no_update, dash.no_update
+    progress = background_jobs.get_job_progress(job['id'])
+    if progress is None:
+        # e.g. running in another worker with the memory cache backend
+        return create_job_progress(job['kind'], progress), True, dash.no_update, dash.no_update
+    if not progress['done']:
+        return create_job_progress(job['kind'], progress), False, dash.no_update, dash.no_update
+    return (
+        create_job_progress(job['kind'], progress),
+        True,
+        'Failed' if progress['error'] else JOB_TEXTS[job['kind']][1].format(count=progress['count']),
+        job['id']
+    )
+
+def get_backfill_times(
+        task: tasks.TaskItem | None,
+        schedule_id: str | None,
+        since: str | None,
+        until: str | None
+    ) -> tuple[tasks.ScheduleSet | None, list[dt], str | None]:
+    """
+    Returns the schedule set and run times of a backfill from the inputs,
+    or an error message in place of them.
+    """
+    if task is None:
+        return None, [], 'No task selected'
+    s_set = task_cache.get_schedule_index(task).get(schedule_id)
+    if s_set is None:
+        return None, [], 'Select a schedule to backfill'
+    since_time = _parse_datetime_input(since)
+    until_time = _parse_datetime_input(until)
+    if since_time is None or until_time is None:
+        return None, [], 'Select the time range to backfill'
+    # one over the limit to tell when the range has too many runs
+    scheduled_times = backfill.get_backfill_times(
+        s_set, since_time, until_time, limit=backfill.MAX_BACKFILL_RUNS + 1
+    )
+    if len(scheduled_times) == 0:
+        return None, [], 'The schedule doesn\'t fire in that range'
+    if len(scheduled_times) > backfill.MAX_BACKFILL_RUNS:
+        return None, [], f'More than {backfill.MAX_BACKFILL_RUNS} runs, use a shorter range'
+    return s_set, scheduled_times, None
+
+
+# dry run of a backfill, showing how many runs it would create
+@dash.callback(
+    Output('td-backfill-preview', 'children', allow_duplicate=True),
+    Input('td-btn-backfill-preview', 'n_clicks'),
+    State('td-task-dropdown', 'value'),
+    State('td-schedule-dropdown', 'value'),
+    State('td-backfill-since', 'value'),
+    State('td-backfill-until', 'value'),
+    prevent_initial_call=True,
+)
+def preview_backfill(n_clicks, task_id, schedule_id, since, until):
+    if n_clicks is None:
+        return dash.no_update
+    _, scheduled_times, error = get_backfill_times(
+        task_cache.get_task(task_id), schedule_id, since, until
+    )
+    if error is not None:
+        return error
+    return (
+        f'{len(scheduled_times)} runs from {scheduled_times[0]} '
+        f'to {scheduled_times[-1]}'
+    )
+
+
+# create the backfill runs in the background, see poll_job_progress
+@dash.callback(
+    Output('td-job', 'data', allow_duplicate=True),
+    Output('td-job-progress-interval', 'disabled', allow_duplicate=True),
+    Output('td-job-progress', 'children', allow_duplicate=True),
+    Output('td-backfill-preview', 'children', allow_duplicate=True),
+    Input('td-btn-backfill', 'n_clicks'),
+    State('td-config-textarea', 'value'),
+    State('td-task-dropdown', 'value'),
+    State('td-schedule-dropdown', 'value'),
+    State('td-backfill-since', 'value'),
+    State('td-backfill-until', 'value'),
+    State('td-backfill-rate', 'value'),
+    prevent_initial_call=True,
+)
+def start_backfill(n_clicks, config, task_id, schedule_id, since, until, runs_per_second):
+    if n_clicks is None:
+        return dash.no_update
+    task = tasks.TaskItem.get(task_id)
+    s_set, scheduled_times, error = get_backfill_times(task, schedule_id, since, until)
+    if error is not None:
+        return dash.no_update, dash.no_update, dash.no_update, error
+    try:
+        new_config = json.loads(config)
+    except json.JSONDecodeError:
+        return dash.no_update, dash.no_update, dash.no_update, 'Config is not valid JSON'
+
+    job_id = backfill.start_backfill_job(
+        task=task,
+        s_set=s_set,
+        scheduled_times=scheduled_times,
+        config=new_config,
+        runs_per_second=max(1, runs_per_second or backfill.DEFAULT_RUNS_PER_SECOND)
+    )
+    return (
+        {'id': job_id, 'kind': 'backfill'},
+        False,
+        create_job_progress('backfill', background_jobs.get_job_progress(job_id)),
+        ''
+    )
+
 
-# create a manual run
+# create a manual run, reloading the shown page of the run history so its
+# page count and paging cursors take the new run into account
 @dash.callback(
     Output({'type': autoclear_cpm.AUTOCLEAR_ID_TYPE, 'index': 'td-out-create-run'}, 'children', allow_duplicate=True),
+    Output('td-run-history-refresh', 'data', allow_duplicate=True),
     Input('td-btn-create-run', 'n_clicks'),
     State('td-config-textarea', 'value'),
     State('td-task-dropdown', 'value'),
@@ -513,14 +1021,14 @@ def cancel_unstarted_runs(ok_clicks, task_id):
 )
 def create_manual_run(n_clicks, config, task_id, schedule_id):
     if n_clicks is None:
-        return 'Create Failed'
+        return 'Create Failed', dash.no_update
     task = tasks.TaskItem.get(task_id)
     if task is None:
-        return 'Create Failed'
+        return 'Create Failed', dash.no_update
     try:
         new_config = json.loads(config)
     except json.JSONDecodeError:
-        return 'Config is not valid JSON'
+        return 'Config is not valid JSON', dash.no_update
 
     if len(task.schedule_sets) == 0:
         cur_schedule = None
@@ -533,7 +1041,7 @@ def create_manual_run(n_clicks, config, task_id, schedule_id):
                 cur_config = {}
                 break
         else:
-            return 'Create Failed'
+            return 'Create Failed', dash.no_update
 
     run = tasks.RunItem.create(
         task=task,
@@ -543,8 +1051,10 @@ def create_manual_run(n_clicks, config, task_id, schedule_id):
         created_by='orcha_ui',
         config_override=cur_config
     )
-    if run:
-        return 'Manual run created'
+    task_cache.invalidate()
+    if not run:
+        return dash.no_update, dash.no_update
+    return 'Manual run created', run.run_idk
 
 
 # delete task callback
@@ -564,6 +1074,8 @@ def delete_task(ok_clicks, task_id):
         task.delete_from_db()
     except Exception:
         return f'/task_details?task_id={task_id}'
+    finally:
+        task_cache.invalidate()
     return '/overview'
 
 
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import copy
+import time
+from datetime import datetime as dt
+from datetime import timedelta as td
+from typing import Callable
+
+from croniter import croniter
+
+from orcha.core import tasks
+from orcha_ui.utils import background_jobs
+
+# most runs a single backfill can create
+MAX_BACKFILL_RUNS = 5000
+# how often the progress of a backfill is reported while runs are created
+PROGRESS_INTERVAL = td(seconds=1)
+# default limit on how quickly runs are created, so the scheduler picks the
+# backfill up gradually rather than finding thousands of due runs at once
+DEFAULT_RUNS_PER_SECOND = 20
+
+
+def get_backfill_times(
+        s_set: tasks.ScheduleSet,
+        since: dt,
+        until: dt,
+        limit: int = MAX_BACKFILL_RUNS,
+    ) -> list[dt]:
+    """
+    Expands a schedule set's cron schedule into the fire times within
+    [since, until], at most `limit` of them.
+    """
+    if not s_set.cron_schedule or until < since:
+        return []
+    # croniter only returns times after the start, so start just before
+    itr = croniter(s_set.cron_schedule, since - td(seconds=1))
+    fire_times: list[dt] = []
+    while len(fire_times) < limit:
+        fire_time = itr.get_next(dt)
+        if fire_time > until:
+            break
+        fire_times.append(fire_time)
+    return fire_times
+
+
+def create_backfill_runs(
+        task: tasks.TaskItem,
+        s_set: tasks.ScheduleSet,
+        scheduled_times: list[dt],
+        config: dict,
+        runs_per_second: float = DEFAULT_RUNS_PER_SECOND,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> int:
+    """
+    Creates a manual run of `task` for each of the scheduled times through
+    RunItem.create, the same as a manual run from the task details page with
+    the schedule set's config replaced by `config`. Each run is created on
+    its own, paced to no more than `runs_per_second`. `on_progress` is
+    called with the number created so far every PROGRESS_INTERVAL and once
+    they're all created. Returns the number created.
+    """
+    # a copy, s_set may be shared through the task snapshot
+    run_schedule = copy.copy(s_set)
+    run_schedule.config = config
+    started_at = time.monotonic()
+    reported_at = started_at
+    created = 0
+    for scheduled_time in scheduled_times:
+        # the n-th run isn't created before n / runs_per_second seconds in
+        wait = created / runs_per_second - (time.monotonic() - started_at)
+        if wait > 0:
+            time.sleep(wait)
+        tasks.RunItem.create(
+            task=task,
+            run_type='manual',
+            schedule=run_schedule,
+            scheduled_time=scheduled_time,
+            created_by='orcha_ui',
+            config_override={}
+        )
+        created += 1
+        if (
+            on_progress is not None
+            and time.monotonic() - reported_at >= PROGRESS_INTERVAL.total_seconds()
+        ):
+            on_progress(created)
+            reported_at = time.monotonic()
+    if on_progress is not None:
+        on_progress(created)
+    return created
+
+
+def start_backfill_job(
+        task: tasks.TaskItem,
+        s_set: tasks.ScheduleSet,
+        scheduled_times: list[dt],
+        config: dict,
+        runs_per_second: float = DEFAULT_RUNS_PER_SECOND,
+    ) -> str:
+    """
+    Starts create_backfill_runs as a background job, returning the job id
+    for background_jobs.get_job_progress.
+    """
+    return background_jobs.start_job(
+        name='backfill',
+        total=len(scheduled_times),
+        work=lambda on_progress: create_backfill_runs(
+            task=task,
+            s_set=s_set,
+            scheduled_times=scheduled_times,
+            config=config,
+            runs_per_second=runs_per_second,
+            on_progress=on_progress
+        )
+    )
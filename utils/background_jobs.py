@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from datetime import timedelta as td
+from typing import Callable
+
+from orcha_ui.utils import ui_cache
+
+logger = logging.getLogger(__name__)
+
+# how long the progress of a job is kept for the UI to read
+JOB_PROGRESS_TTL = td(hours=1)
+
+
+def _job_key(job_id: str) -> str:
+    return ui_cache.make_key('background-job', job_id)
+
+
+def _set_job_progress(job_id: str, progress: dict):
+    ui_cache.get_cache().set(_job_key(job_id), progress, JOB_PROGRESS_TTL)
+
+
+def get_job_progress(job_id: str) -> dict | None:
+    """
+    Returns {'total', 'count', 'done', 'error'} for a job started with
+    start_job, or None if it isn't known (e.g. the memory cache backend and
+    the job is running in another worker).
+    """
+    found, progress = ui_cache.get_cache().get(_job_key(job_id))
+    if not found:
+        # the progress is only shared between workers by the kvdb and file
+        # backends, see UI_CACHE_BACKEND
+        logger.warning(
+            'progress of background job %s not found, if the UI runs more '
+            'than one worker set UI_CACHE_BACKEND to kvdb or file', job_id
+        )
+        return None
+    return progress
+
+
+def start_job(
+        name: str,
+        total: int,
+        work: Callable[[Callable[[int], None]], object]
+    ) -> str:
+    """
+    Runs `work` on a background thread so long running writes don't time
+    out the callback, returning a job id for get_job_progress. `work` is
+    passed a function to call with the number of items done so far.
+    """
+    job_id = uuid.uuid4().hex
+    progress = {
+        'total': total,
+        'count': 0,
+        'done': False,
+        'error': None,
+    }
+    _set_job_progress(job_id, progress)
+
+    def update_progress(count: int):
+        progress['count'] = count
+        _set_job_progress(job_id, progress)
+
+    def run():
+        try:
+            work(update_progress)
+        except Exception as e:
+            logger.exception('background job %s (%s) failed', name, job_id)
+            progress['error'] = str(e)
+        progress['done'] = True
+        _set_job_progress(job_id, progress)
+
+    threading.Thread(target=run, name=f'{name}-{job_id}', daemon=True).start()
+    return job_id
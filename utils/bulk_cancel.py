@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import datetime as dt
+from typing import Callable
+
+from sqlalchemy import func, select, update
+
+from orcha.core import tasks
+from orcha_ui.utils import background_jobs, core_runs
+
+# runs cancelled per transaction, small enough that the scheduler isn't kept
+# waiting on the row locks while a large backlog is cancelled
+BATCH_SIZE = 500
+CANCEL_MESSAGE = 'Unstarted runs manually cancelled'
+
+
+def _get_conditions(
+        task: tasks.TaskItem,
+        set_idk: str | None = None,
+        since: dt | None = None,
+        until: dt | None = None,
+    ) -> list:
+    conditions = [
+        core_runs.RunRecord.task_idf == task.task_idk,
+        # the same runs as TaskItem.get_queued_runs
+        core_runs.RunRecord.progress == 'queued',
+    ]
+    if set_idk is not None:
+        conditions.append(core_runs.RunRecord.set_idf == set_idk)
+    if since is not None:
+        conditions.append(core_runs.RunRecord.scheduled_time >= since)
+    if until is not None:
+        conditions.append(core_runs.RunRecord.scheduled_time <= until)
+    return conditions
+
+
+def count_unstarted_runs(
+        task: tasks.TaskItem,
+        set_idk: str | None = None,
+        since: dt | None = None,
+        until: dt | None = None,
+    ) -> int:
+    """
+    Counts the unstarted runs cancel_unstarted_runs would cancel.
+    """
+    query = select(func.count()).select_from(core_runs.RunRecord).where(
+        *_get_conditions(task, set_idk, since, until)
+    )
+    with core_runs.begin() as tx:
+        return tx.execute(query).scalar_one()
+
+
+def cancel_unstarted_runs(
+        task: tasks.TaskItem,
+        set_idk: str | None = None,
+        since: dt | None = None,
+        until: dt | None = None,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> int:
+    """
+    Cancels the unstarted runs of a task, optionally only those of one
+    schedule set and/or scheduled within [since, until]. Each batch of
+    BATCH_SIZE runs is a single update, leaving the runs as set_status
+    ('cancelled') and set_progress('complete', zero_duration=True) would.
+    `on_progress` is called with the number cancelled so far after each
+    batch. Returns the number of runs cancelled.
+    """
+    conditions = _get_conditions(task, set_idk, since, until)
+    cancelled = 0
+    while True:
+        batch = select(core_runs.RunRecord.run_idk).where(
+            *conditions
+        ).limit(BATCH_SIZE).scalar_subquery()
+        now = dt.now()
+        query = update(core_runs.RunRecord).where(
+            core_runs.RunRecord.run_idk.in_(batch),
+            # in case the scheduler picked the run up in the meantime
+            core_runs.RunRecord.progress == 'queued',
+        ).values(
+            status='cancelled',
+            output={'message': CANCEL_MESSAGE},
+            progress='complete',
+            start_time=now,
+            end_time=now,
+        ).execution_options(synchronize_session=False)
+
+        with core_runs.begin() as tx:
+            row_count = tx.execute(query).rowcount
+        if row_count == 0:
+            return cancelled
+        cancelled += row_count
+        if on_progress is not None:
+            on_progress(cancelled)
+
+
+def start_cancel_job(
+        task: tasks.TaskItem,
+        set_idk: str | None = None,
+        since: dt | None = None,
+        until: dt | None = None,
+    ) -> str:
+    """
+    Starts cancel_unstarted_runs as a background job, returning the job id
+    for background_jobs.get_job_progress.
+    """
+    return background_jobs.start_job(
+        name='bulk-cancel',
+        total=count_unstarted_runs(task, set_idk, since, until),
+        work=lambda on_progress: cancel_unstarted_runs(
+            task=task,
+            set_idk=set_idk,
+            since=since,
+            until=until,
+            on_progress=on_progress
+        )
+    )
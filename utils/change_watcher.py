@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+from sqlalchemy import select
+
+from orcha.core import tasks
+from orcha_ui.utils import core_runs, run_queries, task_cache
+
+logger = logging.getLogger(__name__)
+
+# how often the single watcher checks the database for changes, this is the
+# only polling left, however many pages are subscribed to the events
+WATCH_INTERVAL = td(seconds=2)
+# events are dropped for subscribers that have stopped reading
+SUBSCRIBER_QUEUE_SIZE = 100
+
+_lock = threading.Lock()
+_subscribers: list[queue.Queue] = []
+_thread: threading.Thread | None = None
+_event_id = 0
+
+
+def _run_version(record) -> tuple:
+    return (record.status, record.progress, record.last_active, record.end_time)
+
+
+def _task_version(task: tasks.TaskItem) -> tuple:
+    # last_active is left out as it changes on every scheduler heartbeat
+    return (
+        task.name,
+        task.status,
+        tuple((s.set_idk, s.cron_schedule) for s in task.schedule_sets),
+    )
+
+
+def _load_run_versions(since: dt) -> dict[str, tuple[str, dt, tuple]]:
+    # unfinished runs plus anything active since the last check, any
+    # unfinished run that drops out of this has finished (or been deleted).
+    # These are two queries as an OR of the two conditions can't use an
+    # index and would scan the whole runs table every check
+    columns = (
+        core_runs.RunRecord.run_idk,
+        core_runs.RunRecord.task_idf,
+        core_runs.RunRecord.scheduled_time,
+        core_runs.RunRecord.status,
+        core_runs.RunRecord.progress,
+        core_runs.RunRecord.last_active,
+        core_runs.RunRecord.end_time,
+    )
+    unfinished_query = select(*columns).where(
+        core_runs.RunRecord.progress.in_(run_queries.UNFINISHED_PROGRESS)
+    )
+    active_query = select(*columns).where(
+        core_runs.RunRecord.last_active >= since
+    )
+    run_versions: dict[str, tuple[str, dt, tuple]] = {}
+    with core_runs.begin() as tx:
+        for query in [unfinished_query, active_query]:
+            for record in tx.execute(query):
+                run_versions[record.run_idk] = (
+                    record.task_idf, record.scheduled_time, _run_version(record)
+                )
+    return run_versions
+
+
+def _publish(event: dict):
+    global _event_id
+    with _lock:
+        _event_id += 1
+        event['id'] = _event_id
+        subscribers = list(_subscribers)
+    for subscriber in subscribers:
+        try:
+            subscriber.put_nowait(event)
+        except queue.Full:
+            pass
+
+
+def _has_subscribers() -> bool:
+    global _thread
+    with _lock:
+        if len(_subscribers) == 0:
+            # the next subscriber starts a new watcher
+            _thread = None
+            return False
+        return True
+
+
+def _get_run_change(
+        run_idk: str,
+        task_idk: str,
+        scheduled_time: dt,
+        old_version: tuple | None,
+        version: tuple | None
+    ) -> dict:
+    return {
+        'run_idk': run_idk,
+        'task_idk': task_idk,
+        'scheduled_time': scheduled_time.isoformat() if scheduled_time else None,
+        # False when only the heartbeat (last_active) moved
+        'status_changed': (
+            old_version is None or version is None
+            or old_version[:2] != version[:2]
+        ),
+        # whether it is or was running, so in a task's active runs
+        'active': any(
+            v is not None and v[1] == 'running'
+            for v in [old_version, version]
+        ),
+    }
+
+
+def _watch():
+    since = dt.now()
+    run_versions: dict[str, tuple[str, dt, tuple]] | None = None
+    task_versions: dict[str, tuple] = {}
+    while _has_subscribers():
+        try:
+            checked_at = dt.now()
+            new_run_versions = _load_run_versions(since)
+            new_task_versions = {
+                task.task_idk: _task_version(task)
+                for task in task_cache.get_all_tasks()
+            }
+        except Exception:
+            logger.exception('failed to check for run and task changes')
+            time.sleep(WATCH_INTERVAL.total_seconds())
+            continue
+
+        if run_versions is None:
+            # nothing to compare against on the first check
+            since = checked_at - WATCH_INTERVAL
+            run_versions = new_run_versions
+            task_versions = new_task_versions
+            time.sleep(WATCH_INTERVAL.total_seconds())
+            continue
+
+        changed_runs = []
+        for run_idk, (task_idk, scheduled_time, version) in new_run_versions.items():
+            old_version = run_versions[run_idk][2] if run_idk in run_versions else None
+            if old_version != version:
+                changed_runs.append(_get_run_change(
+                    run_idk, task_idk, scheduled_time, old_version, version
+                ))
+        for run_idk, (task_idk, scheduled_time, version) in run_versions.items():
+            if run_idk not in new_run_versions and version[1] != 'complete':
+                changed_runs.append(_get_run_change(
+                    run_idk, task_idk, scheduled_time, version, None
+                ))
+        changed_tasks = [
+            task_idk
+            for task_idk in set(task_versions) | set(new_task_versions)
+            if task_versions.get(task_idk) != new_task_versions.get(task_idk)
+        ]
+        # only keep recently active runs around to compare against
+        since = checked_at - WATCH_INTERVAL
+        run_versions = new_run_versions
+        task_versions = new_task_versions
+
+        if changed_runs or changed_tasks:
+            _publish({
+                'runs': changed_runs,
+                'tasks': sorted(changed_tasks),
+            })
+        time.sleep(WATCH_INTERVAL.total_seconds())
+
+
+def subscribe() -> queue.Queue:
+    """
+    Returns a queue that receives an event dict for every batch of run/task
+    changes, starting the watcher thread if it isn't running yet (it stops
+    once there are no subscribers). Each event has an 'id', the changed
+    'runs' (run_idk, task_idk, scheduled_time, whether the status or progress
+    changed rather than just the heartbeat and whether it is or was running)
+    and the task_idks of the changed 'tasks'.
+    """
+    global _thread
+    subscriber: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+    with _lock:
+        _subscribers.append(subscriber)
+        if _thread is None:
+            _thread = threading.Thread(
+                target=_watch,
+                name='orcha-ui-change-watcher',
+                daemon=True
+            )
+            _thread.start()
+    return subscriber
+
+
+def unsubscribe(subscriber: queue.Queue):
+    with _lock:
+        if subscriber in _subscribers:
+            _subscribers.remove(subscriber)
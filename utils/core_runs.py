@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from orcha.core import tasks
+
+# The orcha core internals the UI uses to query runs in bulk, as the public
+# RunItem/TaskItem API only loads them one task at a time. Everything that
+# reaches past that API goes through here, so a change on the core side only
+# needs fixing in one place. Checked against the core's runs table with the
+# columns below, the sessionmaker `tasks.s_maker` and
+# `RunItem._from_sqlalchemy_record(record, task)`.
+
+RunRecord = tasks.RunRecord
+
+# the runs columns the UI reads or filters on directly
+RUN_COLUMNS = (
+    'run_idk', 'task_idf', 'set_idf', 'run_type', 'created_time',
+    'created_by', 'scheduled_time', 'start_time', 'end_time', 'last_active',
+    'config', 'status', 'progress', 'output',
+)
+
+
+def _check_core():
+    # fail at import with a clear message rather than part way through a
+    # callback once the core has moved on
+    missing = [
+        name for name in RUN_COLUMNS
+        if name not in RunRecord.__table__.columns
+    ]
+    if missing:
+        raise ImportError(
+            f'orcha core runs table is missing the columns {missing}, '
+            'update orcha_ui.utils.core_runs for this version of the core'
+        )
+    if not hasattr(tasks, 's_maker') or not hasattr(tasks.RunItem, '_from_sqlalchemy_record'):
+        raise ImportError(
+            'orcha core no longer has tasks.s_maker or '
+            'RunItem._from_sqlalchemy_record, update orcha_ui.utils.core_runs'
+        )
+
+
+_check_core()
+
+
+def begin():
+    """
+    Begins a transaction on the orcha core database, use as
+    `with core_runs.begin() as tx:`.
+    """
+    return tasks.s_maker.begin()
+
+
+def to_run_item(record: RunRecord, task: tasks.TaskItem) -> tasks.RunItem:
+    """
+    Turns a row of the runs table into a RunItem of `task`.
+    """
+    return tasks.RunItem._from_sqlalchemy_record(record, task)
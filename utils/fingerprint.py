@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime as dt
+
+from sqlalchemy import func, select
+
+from orcha.core import tasks
+from orcha_ui.utils import core_runs, run_queries, single_flight
+
+
+def fingerprint(*values) -> str:
+    """
+    Short hash of any JSON-able values (anything else is hashed by its str),
+    used to tell whether what a client holds is still current.
+    """
+    return hashlib.sha1(
+        json.dumps(values, default=str).encode()
+    ).hexdigest()[:10]
+
+
+def _get_run_summary(task_idks: list[str], *conditions) -> list[tuple]:
+    query = select(
+        core_runs.RunRecord.task_idf,
+        core_runs.RunRecord.status,
+        core_runs.RunRecord.progress,
+        func.count(),
+        func.max(core_runs.RunRecord.last_active),
+        func.max(core_runs.RunRecord.end_time),
+    ).where(
+        core_runs.RunRecord.task_idf.in_(task_idks),
+        *conditions
+    ).group_by(
+        core_runs.RunRecord.task_idf,
+        core_runs.RunRecord.status,
+        core_runs.RunRecord.progress,
+    ).order_by(
+        core_runs.RunRecord.task_idf,
+        core_runs.RunRecord.status,
+        core_runs.RunRecord.progress,
+    )
+    with core_runs.begin() as tx:
+        return [tuple(row) for row in tx.execute(query)]
+
+
+@single_flight.coalesce
+def get_runs_fingerprint(
+        task_list: list[tasks.TaskItem],
+        since: dt,
+        until: dt | None = None,
+        window_settled: bool = False,
+    ) -> str:
+    """
+    Fingerprints the runs of a set of tasks scheduled within a window, plus
+    any unfinished runs. Any run being added, removed, changing
+    status/progress or recording activity changes it. With `window_settled`
+    the window's runs are taken as no longer changing (e.g. they're served
+    from the historical cache) and only the unfinished runs are checked.
+    """
+    task_idks = sorted(task.task_idk for task in task_list)
+    if len(task_idks) == 0:
+        return fingerprint([])
+
+    # separate queries, as an OR of the two conditions can't use an index
+    window_rows = []
+    if not window_settled:
+        in_window = [core_runs.RunRecord.scheduled_time >= since]
+        if until is not None:
+            in_window.append(core_runs.RunRecord.scheduled_time <= until)
+        window_rows = _get_run_summary(task_idks, *in_window)
+    unfinished_rows = _get_run_summary(
+        task_idks,
+        core_runs.RunRecord.progress.in_(run_queries.UNFINISHED_PROGRESS)
+    )
+    return fingerprint(window_rows, unfinished_rows)
+
+
+def get_task_definition(task: tasks.TaskItem) -> tuple:
+    """
+    What a task's fingerprint covers, everything the pages show of a task
+    definition, leaving out last_active as that moves on every scheduler
+    heartbeat. Anything fingerprinting a task (e.g. the overview's per task
+    versions) should start from this so the fingerprints can't disagree.
+    """
+    return (
+        task.task_idk,
+        task.name,
+        task.description,
+        task.status,
+        task.task_tags,
+        task.task_metadata,
+        [(s.set_idk, s.cron_schedule, s.config) for s in task.schedule_sets],
+    )
+
+
+def get_tasks_fingerprint(task_list: list[tasks.TaskItem]) -> str:
+    """
+    Fingerprints the definitions of a set of tasks, see get_task_definition.
+    """
+    return fingerprint([get_task_definition(task) for task in task_list])
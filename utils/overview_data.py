@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+from orcha.core import scheduler, tasks
+from orcha_ui.utils import run_queries, single_flight, ui_cache
+from orcha_ui.utils.task_catalog import NO_WORKSPACE, get_task_workspace
+
+RECENT_RUN_COUNT = 5
+# how long a loaded overview is reused for the same tasks and window
+OVERVIEW_CACHE_TTL = td(seconds=15)
+# once a window ended this long ago its runs are treated as settled and
+# cached for HISTORICAL_CACHE_TTL, runs still going after this won't show
+# their later changes in that window
+HISTORICAL_SETTLE_TIME = td(hours=1)
+HISTORICAL_CACHE_TTL = td(days=1)
+
+
+@dataclass
+class OverviewData:
+    """
+    Everything the overview task list is built from, loaded in one go so
+    the same data can be used to either build or patch the task list.
+    """
+    display_start_time: dt
+    display_end_time: dt
+    # tasks in the order they are shown in the overview summary
+    summary_tasks: list[tasks.TaskItem]
+    # (workspace, tasks) in the order the workspace containers are shown
+    workspaces: list[tuple[str, list[tasks.TaskItem]]]
+    window_runs: dict[str, list[tasks.RunItem]]
+    latest_runs: dict[str, list[tasks.RunItem]]
+    active_runs: dict[str, list[tasks.RunItem]]
+    scheduler_last_active: dt | None
+    scheduler_loaded_at: dt | None
+
+
+def load_overview_data(
+        all_tasks: list[tasks.TaskItem],
+        display_start_time: dt,
+        display_end_time: dt
+    ) -> OverviewData:
+    # load all the runs in one query rather than one query per task
+    # and only for the window that is actually displayed
+    window_runs = load_window_runs(
+        all_tasks=all_tasks,
+        display_start_time=display_start_time,
+        display_end_time=display_end_time
+    )
+    # the recent runs strip only needs the last few runs per task
+    latest_runs = run_queries.get_latest_runs_for_tasks(
+        task_list=all_tasks,
+        count=RECENT_RUN_COUNT
+    )
+    # and the active runs strip from one query for all running runs
+    active_runs = run_queries.get_active_runs_for_tasks(task_list=all_tasks)
+    scheduler_last_active, scheduler_loaded_at = load_scheduler_heartbeat()
+
+    return _build_overview_data(
+        all_tasks=all_tasks,
+        display_start_time=display_start_time,
+        display_end_time=display_end_time,
+        window_runs=window_runs,
+        latest_runs=latest_runs,
+        active_runs=active_runs,
+        scheduler_last_active=scheduler_last_active,
+        scheduler_loaded_at=scheduler_loaded_at,
+    )
+
+
+def is_window_settled(display_end_time: dt) -> bool:
+    """
+    Whether a window ended long enough ago that its runs are treated as no
+    longer changing, see HISTORICAL_SETTLE_TIME.
+    """
+    return display_end_time < dt.now() - HISTORICAL_SETTLE_TIME
+
+
+def load_window_runs(
+        all_tasks: list[tasks.TaskItem],
+        display_start_time: dt,
+        display_end_time: dt
+    ) -> dict[str, list[tasks.RunItem]]:
+    """
+    Loads the runs for the window, serving windows that have settled from
+    the historical cache so a past window (e.g. a link shared for an
+    incident review) is only queried once.
+    """
+    def load():
+        return run_queries.get_runs_for_tasks(
+            task_list=all_tasks,
+            since=display_start_time,
+            until=display_end_time
+        )
+
+    if not is_window_settled(display_end_time):
+        return load()
+    return ui_cache.get_or_compute(
+        key=ui_cache.make_key(
+            'window-runs',
+            sorted(task.task_idk for task in all_tasks),
+            display_start_time,
+            display_end_time
+        ),
+        ttl=HISTORICAL_CACHE_TTL,
+        compute=load,
+        cache=ui_cache.get_historical_cache()
+    )
+
+
+@single_flight.coalesce
+def load_scheduler_heartbeat() -> tuple[dt | None, dt | None]:
+    """
+    Returns the scheduler's (last_active, loaded_at).
+    """
+    return (
+        scheduler.Scheduler.get_last_active(),
+        scheduler.Scheduler.get_loaded_at(),
+    )
+
+
+def sort_summary_tasks(all_tasks: list[tasks.TaskItem]) -> list[tasks.TaskItem]:
+    """
+    Returns the tasks in the order of the overview summary cards.
+    """
+    return sorted(all_tasks, key=lambda x: (
+        x.task_metadata.get('workspace', 'No Workspace'),
+        x.name
+    ), reverse=False)
+
+
+def subset_overview_data(
+        source: OverviewData,
+        all_tasks: list[tasks.TaskItem],
+        display_start_time: dt,
+        display_end_time: dt,
+        covered_until: dt | None = None
+    ) -> OverviewData | None:
+    """
+    Builds the overview data for a set of tasks and a window from already
+    loaded data, e.g. the pre-warmed snapshot, without going to the database.
+    `covered_until` lets the window end after the source does, for sources
+    whose newer runs are picked up by the next refresh anyway. Returns None
+    if the source doesn't cover the window or all of the tasks.
+    """
+    if covered_until is None:
+        covered_until = source.display_end_time
+    if (
+        display_start_time < source.display_start_time
+        or display_end_time > covered_until
+    ):
+        return None
+    if any(task.task_idk not in source.window_runs for task in all_tasks):
+        return None
+
+    window_runs = {
+        task.task_idk: [
+            run for run in source.window_runs[task.task_idk]
+            if display_start_time <= run.scheduled_time <= display_end_time
+        ]
+        for task in all_tasks
+    }
+    return _build_overview_data(
+        all_tasks=all_tasks,
+        display_start_time=display_start_time,
+        display_end_time=display_end_time,
+        window_runs=window_runs,
+        latest_runs={task.task_idk: source.latest_runs[task.task_idk] for task in all_tasks},
+        active_runs={task.task_idk: source.active_runs[task.task_idk] for task in all_tasks},
+        scheduler_last_active=source.scheduler_last_active,
+        scheduler_loaded_at=source.scheduler_loaded_at,
+    )
+
+
+def _build_overview_data(
+        all_tasks: list[tasks.TaskItem],
+        display_start_time: dt,
+        display_end_time: dt,
+        window_runs: dict[str, list[tasks.RunItem]],
+        latest_runs: dict[str, list[tasks.RunItem]],
+        active_runs: dict[str, list[tasks.RunItem]],
+        scheduler_last_active: dt | None,
+        scheduler_loaded_at: dt | None,
+    ) -> OverviewData:
+    summary_tasks = sort_summary_tasks(all_tasks)
+
+    # Order the tasks by workspace name, then group them in one pass
+    all_tasks = sorted(all_tasks, key=lambda x: x.task_metadata.get('workspace', 'Other'))
+    grouped: dict[str, list[tasks.TaskItem]] = {NO_WORKSPACE: []}
+    for task in all_tasks:
+        grouped.setdefault(get_task_workspace(task), []).append(task)
+    workspaces = list(grouped.items())
+
+    return OverviewData(
+        display_start_time=display_start_time,
+        display_end_time=display_end_time,
+        summary_tasks=summary_tasks,
+        workspaces=workspaces,
+        window_runs=window_runs,
+        latest_runs=latest_runs,
+        active_runs=active_runs,
+        scheduler_last_active=scheduler_last_active,
+        scheduler_loaded_at=scheduler_loaded_at,
+    )
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+from orcha.core import tasks
+from orcha_ui.utils import schedule_cache, task_cache
+from orcha_ui.utils.overview_data import (
+    OverviewData,
+    load_overview_data,
+    subset_overview_data,
+)
+
+logger = logging.getLogger(__name__)
+
+# the default overview window is 6 hours, with an hour to spare as the
+# window's end time only has minute precision
+PREWARM_LOOKBACK = td(hours=7)
+# the snapshot only serves windows ending within this of now, the end time
+# input's precision
+LIVE_WINDOW_TOLERANCE = td(minutes=1)
+
+_lock = threading.Lock()
+_snapshot: OverviewData | None = None
+_interval: td | None = None
+_thread: threading.Thread | None = None
+
+
+def refresh():
+    """
+    Loads the overview data for all tasks over the pre-warm window and
+    swaps it in as the current snapshot. Also warms the next fire time
+    cache so building the summary cards doesn't need croniter.
+    """
+    global _snapshot
+    all_tasks = task_cache.get_all_tasks()
+    now = dt.now()
+    data = load_overview_data(
+        all_tasks=all_tasks,
+        display_start_time=now - PREWARM_LOOKBACK,
+        display_end_time=now
+    )
+    for task in all_tasks:
+        schedule_cache.get_next_fire_time(task)
+    with _lock:
+        _snapshot = data
+
+
+def _run(interval: td):
+    while True:
+        try:
+            refresh()
+        except Exception:
+            # keep the worker alive, callbacks fall back to loading the
+            # data themselves once the snapshot goes stale
+            logger.exception('failed to pre-warm the overview data')
+        time.sleep(interval.total_seconds())
+
+
+def start(interval_seconds: int):
+    """
+    Starts the background worker that re-loads the overview snapshot every
+    `interval_seconds`. Only the first call starts a worker.
+    """
+    global _interval, _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _interval = td(seconds=interval_seconds)
+        _thread = threading.Thread(
+            target=_run,
+            args=(_interval,),
+            name='orcha-ui-overview-prewarm',
+            daemon=True
+        )
+        _thread.start()
+
+
+def get_overview_data(
+        all_tasks: list[tasks.TaskItem],
+        display_start_time: dt,
+        display_end_time: dt
+    ) -> OverviewData | None:
+    """
+    Returns the overview data for the given tasks and window from the
+    pre-warmed snapshot, or None if the worker isn't running, the snapshot
+    is stale, the window doesn't end now or it doesn't cover the request.
+    """
+    now = dt.now()
+    if not (now - LIVE_WINDOW_TOLERANCE <= display_end_time <= now):
+        return None
+    with _lock:
+        snapshot = _snapshot
+        interval = _interval
+    if snapshot is None or interval is None:
+        return None
+    # allow for one missed refresh before treating the snapshot as stale
+    if snapshot.display_end_time < now - (interval * 2):
+        return None
+    # the window usually ends after the snapshot was taken, as the page's end
+    # time is a later minute, any runs since then come with the next refresh
+    return subset_overview_data(
+        source=snapshot,
+        all_tasks=all_tasks,
+        display_start_time=display_start_time,
+        display_end_time=display_end_time,
+        covered_until=now
+    )
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from datetime import datetime as dt
+
+from sqlalchemy import Select, column, func, select, true, tuple_, values
+from sqlalchemy.orm import aliased
+
+from orcha.core import tasks
+from orcha_ui.utils import core_runs, single_flight
+
+
+# the run columns the run history can be sorted and filtered on
+RUN_HISTORY_COLUMNS = (
+    'run_idk', 'set_idf', 'run_type', 'status', 'progress',
+    'scheduled_time', 'start_time', 'end_time',
+)
+# the progress of runs that haven't finished yet
+UNFINISHED_PROGRESS = ('queued', 'running')
+# sorts on these are paged with a keyset (as they're never null), any other
+# sort falls back to an offset
+KEYSET_COLUMNS = ('run_idk', 'status', 'scheduled_time')
+_FILTER_OPERATORS = {
+    '=': lambda col, val: col == val,
+    '!=': lambda col, val: col != val,
+    '<': lambda col, val: col < val,
+    '<=': lambda col, val: col <= val,
+    '>': lambda col, val: col > val,
+    '>=': lambda col, val: col >= val,
+    'contains': lambda col, val: col.ilike(f'%{val}%'),
+}
+
+
+def _load_runs_by_task(
+        task_map: dict[str, tasks.TaskItem],
+        query: Select | None
+    ) -> dict[str, list[tasks.RunItem]]:
+    # the runs from a select of runs table rows grouped by task_idk, in the
+    # query's order, with an (empty) entry for every task in task_map. The
+    # batched run queries all share this so their results stay alike
+    task_runs: dict[str, list[tasks.RunItem]] = {
+        task_idk: [] for task_idk in task_map
+    }
+    if query is None:
+        return task_runs
+    with core_runs.begin() as tx:
+        for record in tx.execute(query).scalars():
+            task_runs[record.task_idf].append(
+                core_runs.to_run_item(record, task_map[record.task_idf])
+            )
+    return task_runs
+
+
+@single_flight.coalesce
+def get_runs_for_tasks(
+        task_list: list[tasks.TaskItem],
+        since: dt,
+        until: dt | None = None,
+    ) -> dict[str, list[tasks.RunItem]]:
+    """
+    Loads the runs for a whole set of tasks in a single query rather than
+    one RunItem.get_all call per task. Returns the runs grouped by task_idk,
+    sorted by scheduled time, with an (empty) entry for every task given.
+    """
+    task_map = {task.task_idk: task for task in task_list}
+    if len(task_map) == 0:
+        return _load_runs_by_task(task_map, None)
+
+    query = select(core_runs.RunRecord).where(
+        core_runs.RunRecord.task_idf.in_(list(task_map.keys())),
+        core_runs.RunRecord.scheduled_time >= since,
+    )
+    if until is not None:
+        query = query.where(core_runs.RunRecord.scheduled_time <= until)
+    query = query.order_by(core_runs.RunRecord.scheduled_time)
+
+    return _load_runs_by_task(task_map, query)
+
+
+@single_flight.coalesce
+def get_latest_runs_for_tasks(
+        task_list: list[tasks.TaskItem],
+        count: int,
+    ) -> dict[str, list[tasks.RunItem]]:
+    """
+    Loads the latest `count` runs (by scheduled time) for each of the given
+    tasks in a single query. Useful for 'last 5 runs' strips where the full
+    run window isn't needed. Runs are grouped by task_idk and sorted oldest
+    to newest.
+    """
+    task_map = {task.task_idk: task for task in task_list}
+    if len(task_map) == 0 or count < 1:
+        return _load_runs_by_task(task_map, None)
+
+    # a lateral subquery per task, so the database can stop after each
+    # task's newest `count` runs rather than ranking its whole run history
+    task_ids = values(
+        column('task_idk', core_runs.RunRecord.task_idf.type), name='task_ids'
+    ).data([(task_idk,) for task_idk in task_map])
+    latest = select(core_runs.RunRecord).where(
+        core_runs.RunRecord.task_idf == task_ids.c.task_idk
+    ).order_by(
+        core_runs.RunRecord.scheduled_time.desc()
+    ).limit(count).lateral('latest_runs')
+    latest_run = aliased(core_runs.RunRecord, latest)
+    query = select(latest_run).select_from(task_ids).join(
+        latest, true()
+    ).order_by(latest_run.scheduled_time)
+
+    return _load_runs_by_task(task_map, query)
+
+
+@single_flight.coalesce
+def get_active_runs_for_tasks(
+        task_list: list[tasks.TaskItem],
+        progress: tuple[str, ...] = ('running',),
+    ) -> dict[str, list[tasks.RunItem]]:
+    """
+    Loads the runs currently in one of the given progress states (by default
+    the same runs as TaskItem.get_running_runs) for a whole set of tasks in
+    a single query. Runs are grouped by task_idk and sorted by scheduled time.
+    """
+    task_map = {task.task_idk: task for task in task_list}
+    if len(task_map) == 0 or len(progress) == 0:
+        return _load_runs_by_task(task_map, None)
+
+    # not limited by scheduled time, a long running run can have been
+    # scheduled well before the displayed window
+    query = select(core_runs.RunRecord).where(
+        core_runs.RunRecord.task_idf.in_(list(task_map.keys())),
+        core_runs.RunRecord.progress.in_(list(progress)),
+    ).order_by(core_runs.RunRecord.scheduled_time)
+
+    return _load_runs_by_task(task_map, query)
+
+
+def get_run_history_page(
+        task: tasks.TaskItem,
+        page_size: int,
+        sort_column: str = 'scheduled_time',
+        descending: bool = True,
+        filters: list[tuple[str, str, object]] | None = None,
+        offset: int = 0,
+        after: tuple | None = None,
+    ) -> tuple[list[tasks.RunItem], int]:
+    """
+    Loads one page of a task's full run history, sorted and filtered in the
+    database. `filters` are (column, operator, value) with the columns from
+    RUN_HISTORY_COLUMNS and operators from _FILTER_OPERATORS. For sorts on
+    KEYSET_COLUMNS pass `after`, the (sort value, run_idk) of the last row of
+    the previous page, rather than an `offset`. Returns the runs and the
+    total number of runs matching the filters.
+    """
+    if sort_column not in RUN_HISTORY_COLUMNS:
+        raise ValueError(f'Unsupported run history column: {sort_column}')
+    sort_col = getattr(core_runs.RunRecord, sort_column)
+
+    conditions = [core_runs.RunRecord.task_idf == task.task_idk]
+    for filter_column, operator, value in filters or []:
+        if filter_column not in RUN_HISTORY_COLUMNS or operator not in _FILTER_OPERATORS:
+            raise ValueError(f'Unsupported run history filter: {filter_column} {operator}')
+        conditions.append(
+            _FILTER_OPERATORS[operator](getattr(core_runs.RunRecord, filter_column), value)
+        )
+
+    # run_idk breaks ties so the order (and the keyset) is deterministic
+    if descending:
+        order_by = [sort_col.desc().nulls_last(), core_runs.RunRecord.run_idk.desc()]
+    else:
+        order_by = [sort_col.asc().nulls_first(), core_runs.RunRecord.run_idk.asc()]
+    query = select(core_runs.RunRecord).where(*conditions).order_by(*order_by)
+    if after is not None and sort_column in KEYSET_COLUMNS:
+        keyset = tuple_(sort_col, core_runs.RunRecord.run_idk)
+        query = query.where(keyset < tuple_(*after) if descending else keyset > tuple_(*after))
+    elif offset > 0:
+        query = query.offset(offset)
+    query = query.limit(page_size)
+
+    count_query = select(func.count()).select_from(core_runs.RunRecord).where(*conditions)
+
+    with core_runs.begin() as tx:
+        runs = [core_runs.to_run_item(record, task) for record in tx.execute(query).scalars()]
+        total = tx.execute(count_query).scalar_one()
+
+    return runs, total
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+from croniter import croniter
+
+from orcha.core import tasks
+
+_lock = threading.Lock()
+# upcoming fire times per (set_idk, cron_schedule), soonest first. Keying
+# on the cron string as well means an edited schedule set gets a fresh entry
+_fire_times: dict[tuple[str, str], list[dt]] = {}
+
+
+def _upcoming(set_idk: str, cron_schedule: str, count: int) -> list[dt]:
+    # must be called with the lock held
+    now = dt.now()
+    key = (set_idk, cron_schedule)
+    cached = [fire_time for fire_time in _fire_times.get(key, []) if fire_time > now]
+    if len(cached) < count:
+        # only parse the cron expression once the cached times run out
+        itr = croniter(cron_schedule, cached[-1] if cached else now)
+        while len(cached) < count:
+            cached.append(itr.get_next(dt))
+    _fire_times[key] = cached
+    return cached[:count]
+
+
+def get_next_fire_times(s_set: tasks.ScheduleSet, count: int = 1) -> list[dt]:
+    """
+    Returns the next `count` fire times for a schedule set. Fire times are
+    cached per (set_idk, cron_schedule) and croniter is only used again once
+    the cached times have passed, or more times are asked for than cached.
+    """
+    if not s_set.cron_schedule or count < 1:
+        return []
+    with _lock:
+        return _upcoming(s_set.set_idk, s_set.cron_schedule, count)
+
+
+def get_next_fire_time(task: tasks.TaskItem) -> dt | None:
+    """
+    Returns the soonest fire time across all of a task's schedule sets, or
+    None if the task has no cron schedules.
+    """
+    fire_times = [
+        fire_time
+        for s_set in task.schedule_sets
+        for fire_time in get_next_fire_times(s_set, count=1)
+    ]
+    if len(fire_times) == 0:
+        return None
+    return min(fire_times)
+
+
+def get_time_until_next_fire(task: tasks.TaskItem) -> td | None:
+    """
+    Cached equivalent of task.get_next_scheduled_time(), the time until
+    the task is next scheduled to run.
+    """
+    next_fire_time = get_next_fire_time(task)
+    if next_fire_time is None:
+        return None
+    return next_fire_time - dt.now()
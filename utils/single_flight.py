@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import functools
+import json
+import threading
+from typing import Any, Callable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+_lock = threading.Lock()
+_in_flight: dict[str, _Call] = {}
+
+
+def _key_part(value: Any) -> Any:
+    # tasks and runs are identified by their ids, so the same task list
+    # loaded by different callbacks still gives the same key
+    if hasattr(value, 'run_idk'):
+        return ['run', value.run_idk]
+    if hasattr(value, 'task_idk'):
+        return ['task', value.task_idk]
+    if isinstance(value, (list, tuple, set, frozenset)):
+        parts = [_key_part(v) for v in value]
+        return sorted(parts, key=str) if isinstance(value, (set, frozenset)) else parts
+    if isinstance(value, dict):
+        return {str(k): _key_part(v) for k, v in value.items()}
+    return value
+
+
+def make_call_key(fn: Callable, args: tuple, kwargs: dict) -> str:
+    """
+    Builds the key of a call from the function and its arguments.
+    """
+    return json.dumps(
+        [
+            f'{fn.__module__}.{fn.__qualname__}',
+            _key_part(args),
+            _key_part(kwargs),
+        ],
+        default=str,
+        sort_keys=True,
+    )
+
+
+def do(key: str, fn: Callable[[], Any]) -> Any:
+    """
+    Calls `fn` unless a call with the same key is already in flight, in
+    which case this waits for that call and returns its result (or raises
+    its exception). Results are shared between the callers, so should be
+    treated as read-only.
+    """
+    with _lock:
+        call = _in_flight.get(key)
+        leader = call is None
+        if leader:
+            call = _Call()
+            _in_flight[key] = call
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    try:
+        call.value = fn()
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            del _in_flight[key]
+        call.done.set()
+    return call.value
+
+
+def call(fn: Callable, *args, **kwargs) -> Any:
+    """
+    Calls `fn(*args, **kwargs)`, sharing the result with any identical
+    call already in flight, e.g. call(tasks.RunItem.get, run_idk).
+    """
+    return do(make_call_key(fn, args, kwargs), lambda: fn(*args, **kwargs))
+
+
+def coalesce(fn: Callable) -> Callable:
+    """
+    Decorator that makes concurrent identical calls to `fn` share one call.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return call(fn, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+from orcha.core import tasks
+from orcha_ui.utils.task_catalog import ScheduleSetIndex, TaskCatalog
+
+# How long a task snapshot is served before the task table is re-read
+TASK_CACHE_TTL = td(seconds=15)
+
+_lock = threading.Lock()
+_snapshot: list[tasks.TaskItem] | None = None
+_snapshot_map: dict[str, tasks.TaskItem] = {}
+_catalog: TaskCatalog | None = None
+_schedule_indexes: dict[str, ScheduleSetIndex] = {}
+_loaded_at: dt | None = None
+
+
+def _refresh_if_stale():
+    # must be called with the lock held, this means concurrent callers
+    # wait on the one query rather than all hitting the database at once
+    global _snapshot, _snapshot_map, _catalog, _schedule_indexes, _loaded_at
+    if (
+        _snapshot is not None
+        and _loaded_at is not None
+        and _loaded_at >= (dt.now() - TASK_CACHE_TTL)
+    ):
+        return
+    _snapshot = tasks.TaskItem.get_all()
+    _snapshot_map = {task.task_idk: task for task in _snapshot}
+    _catalog = None
+    _schedule_indexes = {}
+    _loaded_at = dt.now()
+
+
+def get_all_tasks() -> list[tasks.TaskItem]:
+    """
+    Returns all tasks from a process-wide snapshot, only re-reading the task
+    table once the snapshot is older than TASK_CACHE_TTL or has been
+    invalidated. The returned list is a copy so callers can sort/filter it,
+    but the TaskItems are shared and should be treated as read-only.
+    """
+    with _lock:
+        _refresh_if_stale()
+        return list(_snapshot or [])
+
+
+def get_task(task_idk: str | None) -> tasks.TaskItem | None:
+    """
+    Gets a single task from the snapshot. Use tasks.TaskItem.get instead
+    when the task is about to be modified.
+    """
+    if not task_idk:
+        return None
+    with _lock:
+        _refresh_if_stale()
+        return _snapshot_map.get(task_idk)
+
+
+def get_catalog() -> TaskCatalog:
+    """
+    Returns the dropdown options and filter index for the current snapshot,
+    only building them once per snapshot.
+    """
+    global _catalog
+    with _lock:
+        _refresh_if_stale()
+        if _catalog is None:
+            _catalog = TaskCatalog.build(_snapshot or [])
+        return _catalog
+
+
+def get_schedule_index(task: tasks.TaskItem) -> ScheduleSetIndex:
+    """
+    Returns the schedule set index of a task, built once per snapshot. Tasks
+    that aren't in the snapshot (e.g. just created) get an uncached index.
+    """
+    with _lock:
+        _refresh_if_stale()
+        if task.task_idk not in _snapshot_map:
+            return ScheduleSetIndex.build(task)
+        index = _schedule_indexes.get(task.task_idk)
+        if index is None:
+            index = ScheduleSetIndex.build(_snapshot_map[task.task_idk])
+            _schedule_indexes[task.task_idk] = index
+        return index
+
+
+def invalidate():
+    """
+    Drops the current snapshot so the next read goes to the database. Call
+    this after anything the UI writes that changes tasks.
+    """
+    global _snapshot, _snapshot_map, _catalog, _schedule_indexes, _loaded_at
+    with _lock:
+        _snapshot = None
+        _snapshot_map = {}
+        _catalog = None
+        _schedule_indexes = {}
+        _loaded_at = None
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from orcha.core import tasks
+
+ALL_TAGS = 'all'
+ALL_WORKSPACES = 'All Workspaces'
+NO_WORKSPACE = 'No Workspace'
+# statuses hidden from the overview unless 'show disabled' is ticked
+HIDDEN_STATUSES = ('disabled', 'deleted')
+# how runs are labelled when they don't have a schedule set to show
+MANUAL_RUN_LABEL = 'Manual'
+NO_SCHEDULES_LABEL = 'No Schedules'
+UNKNOWN_SCHEDULE_LABEL = 'Unknown'
+
+
+def get_task_workspace(task: tasks.TaskItem) -> str:
+    return task.task_metadata.get('workspace', NO_WORKSPACE)
+
+
+@dataclass
+class TaskCatalog:
+    """
+    The overview dropdown options and clientside filter index for a task
+    snapshot, worked out once per snapshot rather than on every callback,
+    see task_cache.get_catalog.
+    """
+    # in snapshot order
+    tasks: list[tasks.TaskItem]
+    tag_options: list[dict] = field(default_factory=list)
+    workspace_options: list[dict] = field(default_factory=list)
+    # what is needed to filter the overview clientside: the [tags, workspace,
+    # status] of each task, the workspaces, and the statuses hidden unless
+    # 'show disabled' is ticked
+    filter_index: dict = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, task_list: list[tasks.TaskItem]) -> TaskCatalog:
+        catalog = cls(tasks=list(task_list))
+        all_tags: set[str] = set()
+        all_workspaces: set[str] = set()
+        for task in catalog.tasks:
+            all_tags.update(task.task_tags)
+            all_workspaces.add(get_task_workspace(task))
+
+        catalog.tag_options = [
+            {'label': tag, 'value': tag}
+            for tag in [ALL_TAGS, *sorted(all_tags - {ALL_TAGS})]
+        ]
+        catalog.workspace_options = [
+            {'label': ws, 'value': ws}
+            for ws in [ALL_WORKSPACES, *sorted(all_workspaces - {ALL_WORKSPACES})]
+        ]
+        catalog.filter_index = {
+            'tasks': {
+                task.task_idk: [
+                    list(task.task_tags),
+                    get_task_workspace(task),
+                    task.status
+                ]
+                for task in catalog.tasks
+            },
+            'workspaces': sorted(all_workspaces),
+            'hidden_statuses': list(HIDDEN_STATUSES),
+        }
+        return catalog
+
+
+@dataclass
+class ScheduleSetIndex:
+    """
+    A task's schedule sets by set_idk, with the text shown for each, so runs
+    can be labelled without scanning the schedule sets for every run, see
+    task_cache.get_schedule_index.
+    """
+    sets: dict[str, tasks.ScheduleSet] = field(default_factory=dict)
+    labels: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, task: tasks.TaskItem) -> ScheduleSetIndex:
+        index = cls()
+        for s_set in task.schedule_sets:
+            index.sets[s_set.set_idk] = s_set
+            index.labels[s_set.set_idk] = s_set.cron_schedule
+        return index
+
+    def get(self, set_idk: str | None) -> tasks.ScheduleSet | None:
+        if set_idk is None:
+            return None
+        return self.sets.get(set_idk)
+
+    def get_run_label(self, run: tasks.RunItem) -> str:
+        """
+        Returns the schedule shown for a run: the cron schedule of its set,
+        or 'Manual'/'No Schedules'/'Unknown'.
+        """
+        if run.run_type == 'manual':
+            return MANUAL_RUN_LABEL
+        if run.set_idf is None:
+            return NO_SCHEDULES_LABEL
+        return self.labels.get(run.set_idf, UNKNOWN_SCHEDULE_LABEL)
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import pickle
+import threading
+from datetime import datetime as dt
+from datetime import timedelta as td
+from typing import Any, Callable
+
+from orcha.utils import kvdb
+from orcha_ui.credentials import (
+    HISTORICAL_CACHE_DIR,
+    ORCHA_CORE_DB,
+    ORCHA_CORE_PASSWORD,
+    ORCHA_CORE_SERVER,
+    ORCHA_CORE_USER,
+    UI_CACHE_BACKEND,
+    UI_CACHE_DIR,
+    UI_CACHE_SECRET,
+)
+from orcha_ui.utils import single_flight
+
+logger = logging.getLogger(__name__)
+
+# prefix for the entries this cache writes to the kvdb, so they're easy to
+# find (and clear) in the KVDB explorer, which doesn't allow saving under it
+KVDB_KEY_PREFIX = 'orcha_ui:cache:'
+# an in-memory tier in front of a shared tier only keeps entries this long,
+# so a worker doesn't keep serving a result another worker has replaced
+MEMORY_TIER_MAX_TTL = td(seconds=5)
+# how many historical results are kept in memory, anything older is only
+# kept in the shared/disk tiers (if there are any)
+HISTORICAL_MEMORY_ENTRIES = 50
+
+
+def make_key(name: str, *parts: Any) -> str:
+    """
+    Builds a cache key from a name and any JSON-able parts (e.g. task ids
+    and a time window), hashing the parts so keys have a fixed length.
+    """
+    digest = hashlib.sha1(
+        json.dumps(parts, default=str, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    return f'{name}:{digest}'
+
+
+def _get_signing_key() -> bytes:
+    if UI_CACHE_SECRET:
+        return UI_CACHE_SECRET.encode('utf-8')
+    # anyone who knows these can already write to the database directly,
+    # so they're no weaker a secret than the storage itself
+    return hashlib.sha256(json.dumps([
+        'orcha_ui:cache', ORCHA_CORE_USER, ORCHA_CORE_PASSWORD,
+        ORCHA_CORE_SERVER, ORCHA_CORE_DB,
+    ]).encode('utf-8')).digest()
+
+
+_SIGNING_KEY = _get_signing_key()
+_SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+
+def _sign(data: bytes) -> bytes:
+    return hmac.new(_SIGNING_KEY, data, hashlib.sha256).digest()
+
+
+def _dumps(value: Any) -> bytes | None:
+    """
+    Pickles a value for a shared tier, prefixed with its HMAC signature.
+    """
+    try:
+        pickled = pickle.dumps(value)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        # not everything (e.g. objects holding a db session) can be shared,
+        # those values are only kept in memory
+        logger.warning('unable to pickle cache value of type %s', type(value).__name__)
+        return None
+    return _sign(pickled) + pickled
+
+
+def _loads(data: bytes) -> Any:
+    """
+    Unpickles a value written by _dumps. The shared tiers can be written to
+    by others (e.g. through the KVDB explorer), and unpickling runs code, so
+    anything without a valid signature is rejected before it is unpickled.
+    """
+    signature, pickled = data[:_SIGNATURE_SIZE], data[_SIGNATURE_SIZE:]
+    if not hmac.compare_digest(signature, _sign(pickled)):
+        raise ValueError('cache entry has an invalid signature')
+    return pickle.loads(pickled)
+
+
+class MemoryCache:
+    """
+    Per-process cache, entries are lost on restart and not shared between
+    workers.
+    """
+
+    def __init__(self, max_ttl: td | None = None, max_entries: int | None = None):
+        self._lock = threading.Lock()
+        self._entries: dict[str, tuple[dt, Any]] = {}
+        self._max_ttl = max_ttl
+        self._max_entries = max_entries
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < dt.now():
+                del self._entries[key]
+                return False, None
+            return True, entry[1]
+
+    def set(self, key: str, value: Any, ttl: td):
+        if self._max_ttl is not None:
+            ttl = min(ttl, self._max_ttl)
+        with self._lock:
+            # drop expired entries as we go so the dict doesn't keep growing
+            now = dt.now()
+            for expired_key in [k for k, (expires, _) in self._entries.items() if expires < now]:
+                del self._entries[expired_key]
+            self._entries.pop(key, None)
+            # dicts keep insertion order, so the first entry is the oldest
+            while self._max_entries is not None and len(self._entries) >= self._max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (now + ttl, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class KvdbCache:
+    """
+    Cache shared by every worker (and surviving restarts) using orcha's
+    kvdb postgres storage, with the ttl as the kvdb expiry.
+    """
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        try:
+            raw_value = kvdb.get(
+                key=KVDB_KEY_PREFIX + key,
+                as_type=str,
+                storage_type='postgres',
+                no_key_return='exception',
+            )
+            value = _loads(base64.b64decode(raw_value))
+        except Exception:
+            # missing, expired, unreadable or not signed by us are all
+            # treated as a miss
+            return False, None
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: td):
+        pickled = _dumps(value)
+        if pickled is None:
+            return
+        try:
+            kvdb.store(
+                storage_type='postgres',
+                key=KVDB_KEY_PREFIX + key,
+                value=base64.b64encode(pickled).decode('ascii'),
+                expiry=ttl,
+            )
+        except Exception:
+            logger.exception('unable to store %s in the kvdb cache', key)
+
+    def delete(self, key: str):
+        try:
+            kvdb.delete(storage_type='postgres', key=KVDB_KEY_PREFIX + key)
+        except Exception:
+            logger.exception('unable to delete %s from the kvdb cache', key)
+
+
+class FileCache:
+    """
+    Cache kept as signed pickle files in a local directory, for tests and
+    single machine setups where a kvdb isn't available.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(
+            self._directory,
+            hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pkl'
+        )
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                expires, value = _loads(f.read())
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return False, None
+        if expires < dt.now():
+            self.delete(key)
+            return False, None
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: td):
+        pickled = _dumps((dt.now() + ttl, value))
+        if pickled is None:
+            return
+        # write then rename so readers never see a partial file
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(pickled)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.exception('unable to write %s to the file cache', key)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+class TieredCache:
+    """
+    Checks each tier in order, copying hits back into the earlier tiers,
+    and writes to every tier.
+    """
+
+    def __init__(self, tiers: list, backfill_ttl: td = MEMORY_TIER_MAX_TTL):
+        self._tiers = tiers
+        self._backfill_ttl = backfill_ttl
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        for index, tier in enumerate(self._tiers):
+            found, value = tier.get(key)
+            if found:
+                for earlier_tier in self._tiers[:index]:
+                    earlier_tier.set(key, value, self._backfill_ttl)
+                return True, value
+        return False, None
+
+    def set(self, key: str, value: Any, ttl: td):
+        for tier in self._tiers:
+            tier.set(key, value, ttl)
+
+    def delete(self, key: str):
+        for tier in self._tiers:
+            tier.delete(key)
+
+
+def create_cache(backend: str, directory: str | None = None):
+    """
+    Creates the cache for a backend name: 'memory', 'kvdb' (memory in front
+    of the kvdb) or 'file' (memory in front of files in `directory`).
+    """
+    if backend == 'memory':
+        return MemoryCache()
+    if backend == 'kvdb':
+        return TieredCache([MemoryCache(max_ttl=MEMORY_TIER_MAX_TTL), KvdbCache()])
+    if backend == 'file':
+        if not directory:
+            raise ValueError('a directory is needed for the file cache backend')
+        return TieredCache([
+            MemoryCache(max_ttl=MEMORY_TIER_MAX_TTL),
+            FileCache(directory)
+        ])
+    raise ValueError(f'Unsupported cache backend: {backend}')
+
+
+_cache = None
+_historical_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Returns the process-wide cache, using the backend configured with
+    UI_CACHE_BACKEND (and UI_CACHE_DIR for the file backend).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = create_cache(UI_CACHE_BACKEND, UI_CACHE_DIR)
+        return _cache
+
+
+def get_historical_cache():
+    """
+    Returns the process-wide cache for results that no longer change, e.g.
+    runs in a window that ended a while ago. These are kept in memory, in
+    the kvdb with the kvdb backend, and spill to disk in HISTORICAL_CACHE_DIR
+    (or UI_CACHE_DIR with the file backend) when set.
+    """
+    global _historical_cache
+    with _cache_lock:
+        if _historical_cache is None:
+            tiers: list = [MemoryCache(max_entries=HISTORICAL_MEMORY_ENTRIES)]
+            if UI_CACHE_BACKEND == 'kvdb':
+                tiers.append(KvdbCache())
+            spill_directory = HISTORICAL_CACHE_DIR or (
+                UI_CACHE_DIR if UI_CACHE_BACKEND == 'file' else None
+            )
+            if spill_directory:
+                tiers.append(FileCache(spill_directory))
+            _historical_cache = TieredCache(tiers, backfill_ttl=td(hours=1))
+        return _historical_cache
+
+
+def get_or_compute(
+        key: str,
+        ttl: td,
+        compute: Callable[[], Any],
+        refresh: bool = False,
+        cache=None
+    ) -> Any:
+    """
+    Returns the cached value for `key`, otherwise calls `compute` and caches
+    the result for `ttl`. With `refresh` the cache is skipped and the value
+    recomputed (and re-cached), e.g. when something is known to have changed.
+    Uses the cache from get_cache unless another `cache` is given. Callers
+    missing the same key at the same time share one call to `compute`.
+    """
+    if cache is None:
+        cache = get_cache()
+    if not refresh:
+        found, value = cache.get(key)
+        if found:
+            return value
+
+    def compute_and_store():
+        value = compute()
+        cache.set(key, value, ttl)
+        return value
+    return single_flight.do(f'ui_cache:{id(cache)}:{key}', compute_and_store)